@@ -0,0 +1,7 @@
+# Bộ đo hiệu năng trang bốc thăm / Draw page benchmark suite
+#
+#   python -m benchmarks                          # chạy và so với benchmarks/baseline.json
+#   python -m benchmarks --output result.json     # ghi kết quả ra tệp JSON
+#   python -m benchmarks --save-baseline          # ghi đè baseline bằng kết quả lần chạy này
+#   python -m benchmarks --only wheel --quick     # chỉ chạy các case có tên chứa "wheel", ít lần lặp
+#   python -m benchmarks.loadtest --sessions 200  # nhiều phiên cùng lúc qua AppTest, phân vị độ trễ (loadtest.py)
@@ -0,0 +1,332 @@
+# Các case đo và phần so sánh với baseline
+# Mỗi case được chạy `repeat` lần, mỗi lần gọi `number` lần liên tiếp; kết quả là thời gian
+# một lần gọi (ms) theo trung vị / nhỏ nhất / trung bình. So sánh dùng trung vị.
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+APP_PATH = os.path.join(ROOT, 'women.py')
+
+WHEEL_SIZES = (2, 4, 8, 12, 32, 128)
+CASES = []
+
+
+# Đăng ký một case; setup() trả về hàm cần đo (gọi không tham số)
+def case(name, repeat=7, number=1):
+    def register(setup):
+        CASES.append({'name': name, 'setup': setup, 'repeat': repeat, 'number': number})
+        return setup
+    return register
+
+
+def measure(fn, repeat, number):
+    fn()  # chạy nóng: nạp font, cache raster, import lười...
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - started) * 1000 / number)
+    return {
+        'median_ms': statistics.median(timings),
+        'min_ms': min(timings),
+        'mean_ms': statistics.fmean(timings),
+        'repeat': repeat,
+        'number': number,
+    }
+
+
+def wheel_positions(n):
+    return [f"{'AB'[i % 2]}{i // 2 + 1}" for i in range(n)]
+
+
+# ---- Vòng quay (matplotlib, raster và SVG) ----
+
+for _n in WHEEL_SIZES:
+    @case(f'wheel.create_wheel[n={_n}]')
+    def _(n=_n):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from draw_engine.wheel import create_wheel
+        
+        positions = wheel_positions(n)
+        angles = iter(np.random.default_rng(0).uniform(0, 360, 10_000))
+        
+        # Dựng Figure và vẽ Agg (chưa mã hóa PNG)
+        def run():
+            fig, _ = create_wheel(positions, next(angles))
+            FigureCanvasAgg(fig).draw()
+        return run
+    
+    @case(f'wheel.pooled_figure[n={_n}]')
+    def _(n=_n):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from draw_engine.wheel import WheelFigurePool
+        
+        positions = wheel_positions(n)
+        angles = iter(np.random.default_rng(0).uniform(0, 360, 10_000))
+        pool = WheelFigurePool()
+        
+        # Xoay Figure mượn từ kho và vẽ Agg (chưa mã hóa PNG)
+        def run():
+            with pool.wheel(positions, next(angles)) as fig:
+                FigureCanvasAgg(fig).draw()
+        return run
+    
+    @case(f'wheel.raster_frame[n={_n}]', number=5)
+    def _(n=_n):
+        from draw_engine.wheel import render_wheel_frame
+        
+        positions = wheel_positions(n)
+        angles = iter(np.random.default_rng(0).uniform(0, 360, 100_000))
+        return lambda: render_wheel_frame(positions, next(angles))
+    
+    @case(f'wheel.svg_frame[n={_n}]', number=100)
+    def _(n=_n):
+        from draw_engine.svg import wheel_svg
+        
+        positions = wheel_positions(n)
+        angles = iter(np.random.default_rng(0).uniform(0, 360, 100_000))
+        return lambda: wheel_svg(positions, next(angles))
+
+
+@case('wheel.encode_figure[n=8]', repeat=5)
+def _():
+    from draw_engine.wheel import create_wheel, encode_figure
+    
+    fig, _ = create_wheel(wheel_positions(8), 33)
+    return lambda: encode_figure(fig)
+
+
+@case('wheel.encode_raster[n=8]', number=5)
+def _():
+    from draw_engine.wheel import encode_wheel_frame, render_wheel_frame
+    
+    frame = render_wheel_frame(wheel_positions(8), 33)
+    return lambda: encode_wheel_frame(frame)
+
+
+# ---- Hình học và quỹ đạo ----
+
+@case('geometry.selected_position[x1000]', number=10)
+def _():
+    from draw_engine.geometry import selected_position
+    
+    positions = wheel_positions(8)
+    angles = np.random.default_rng(0).uniform(0, 360, 1000).tolist()
+    return lambda: [selected_position(positions, angle) for angle in angles]
+
+
+@case('geometry.selected_positions[x1e6]')
+def _():
+    from draw_engine.geometry import selected_positions
+    
+    positions = wheel_positions(8)
+    angles = np.random.default_rng(0).uniform(0, 360, 1_000_000)
+    return lambda: selected_positions(positions, angles)
+
+
+for _frames in (10, 300):
+    @case(f'trajectory.spin_trajectory[frames={_frames}]', number=100)
+    def _(frames=_frames):
+        from draw_engine.trajectory import spin_trajectory
+        
+        rng = np.random.default_rng(0)
+        return lambda: spin_trajectory(rng.uniform(0, 360), int(rng.integers(8)), 8, n_frames=frames, rng=rng)
+
+
+# ---- Bốc thăm không giao diện ----
+
+@case('draw.run_draw[teams=8]', number=20)
+def _():
+    from draw_engine.state import run_draw
+    
+    rng = np.random.default_rng(0)
+    return lambda: run_draw(rng=rng)
+
+
+@case('draw.plan_commit[teams=8]', number=20)
+def _():
+    from draw_engine.state import ALL_TEAMS, commit_draw, init_state, plan_spin
+    
+    rng = np.random.default_rng(0)
+    
+    # Bốc thăm đủ 8 đội theo đúng luồng của trang: tính quỹ đạo 40 khung hình rồi ghi nhận
+    def run():
+        state = SimpleNamespace()
+        init_state(state)
+        for team in ALL_TEAMS:
+            position, angles = plan_spin(state, rng, n_frames=40)
+            commit_draw(state, team, position, angles[-1])
+    return run
+
+
+# Tập vị trí hợp lệ cho một đội ở giải 64 đội / 16 bảng: 4 pot (pot đầu là hạt giống)
+# và 60 cặp cấm ngẫu nhiên, đo ở đầu lượt bốc thăm và khi đã xếp được một nửa
+for _placed in (0, 32):
+    @case(f'draw.allowed_positions[teams=64,placed={_placed}]', number=5)
+    def _(placed=_placed):
+        from draw_engine.constraints import DrawRules
+        from draw_engine.state import DrawState, commit_draw, make_positions, make_result_table
+        
+        rng = np.random.default_rng(0)
+        groups = [chr(ord('A') + i) for i in range(16)]
+        teams = [f"T{i}" for i in range(64)]
+        pots = [teams[i::4] for i in range(4)]
+        forbidden = [tuple(rng.choice(teams, 2, replace=False)) for _ in range(60)]
+        rules = DrawRules(forbidden=forbidden, pots=pots[1:], seeds=pots[0])
+        
+        state = DrawState(positions=make_positions(groups, 4), result_table=make_result_table(groups, 4))
+        order = list(rng.permutation(teams))
+        for team in order[:placed]:
+            allowed = rules.allowed_positions(state, team, teams)
+            commit_draw(state, team, allowed[int(rng.integers(len(allowed)))], 0)
+        return lambda: rules.allowed_positions(state, order[placed], teams)
+
+
+# ---- Chạy lại toàn bộ trang qua AppTest ----
+
+def app_test(mode):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+    
+    # Các cache st.cache_resource (ảnh vòng quay, làm nóng...) sống suốt tiến trình:
+    # xóa để mỗi chế độ bắt đầu như một máy chủ mới, không dùng lại kết quả của chế độ trước
+    st.cache_resource.clear()
+    os.environ['WHEEL_RENDER_MODE'] = mode
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    at.run()
+    
+    # Chờ luồng nền vẽ trước xong để không chiếm CPU của các phép đo sau
+    if 'next_spin' in at.session_state:
+        for future in at.session_state['next_spin'].frames:
+            future.result()
+    return at
+
+
+# Chạy lại như khi người xem thao tác (AppTest cần đặt lại giá trị gốc cho selectbox ngôn ngữ)
+def rerun(at):
+    at.selectbox[0].set_value("vi")
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+
+for _mode in ('client', 'raster', 'figure', 'svg'):
+    @case(f'app.rerun_idle[{_mode}]', repeat=5)
+    def _(mode=_mode):
+        at = app_test(mode)
+        return lambda: rerun(at)
+
+
+@case('app.rerun_spinning[client]', repeat=5)
+def _():
+    at = app_test('client')
+    at.selectbox[0].set_value("vi")
+    next(b for b in at.button if b.label == 'Bốc thăm').click().run()
+    
+    # Lượt quay đang chờ trình duyệt báo xong: mỗi lần chạy lại phải gửi lại quỹ đạo
+    if at.session_state['pending_spin'] is None:
+        raise RuntimeError("no spin in progress")
+    return lambda: rerun(at)
+
+
+@case('app.draw_cycle[client]', repeat=3)
+def _():
+    # Một lượt bốc thăm trọn vẹn: bấm nút (tính quỹ đạo) rồi nhận kết quả từ component
+    def run():
+        at = app_test('client')
+        at.selectbox[0].set_value("vi")
+        next(b for b in at.button if b.label == 'Bốc thăm').click().run()
+        pending = at.session_state['pending_spin']
+        at.session_state['spin_wheel'] = {'id': pending['id'], 'angle': pending['end'] % 360}
+        rerun(at)
+        if at.session_state['pending_spin'] is not None:
+            raise RuntimeError("spin was not committed")
+    return run
+
+
+def environment():
+    import matplotlib
+    import streamlit
+    
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__,
+        'matplotlib': matplotlib.__version__,
+        'streamlit': streamlit.__version__,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def run_cases(only=None, quick=False):
+    results = {}
+    for spec in CASES:
+        if only and not any(pattern in spec['name'] for pattern in only):
+            continue
+        repeat = min(spec['repeat'], 3) if quick else spec['repeat']
+        results[spec['name']] = measure(spec['setup'](), repeat, spec['number'])
+        print(f"{spec['name']:<42} {results[spec['name']]['median_ms']:>10.3f} ms", file=sys.stderr)
+    return results
+
+
+# So trung vị với baseline: tỉ lệ > threshold là chậm đi, < 1/threshold là nhanh lên
+def compare(results, baseline, threshold=1.25):
+    rows = []
+    for name, result in results.items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            rows.append({'name': name, 'median_ms': result['median_ms'], 'baseline_ms': None, 'ratio': None, 'status': 'new'})
+            continue
+        ratio = result['median_ms'] / base['median_ms'] if base['median_ms'] else float('inf')
+        status = 'slower' if ratio > threshold else 'faster' if ratio < 1 / threshold else 'same'
+        rows.append({'name': name, 'median_ms': result['median_ms'], 'baseline_ms': base['median_ms'],
+                     'ratio': ratio, 'status': status})
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Đo hiệu năng trang bốc thăm / Draw page benchmarks")
+    parser.add_argument('--only', nargs='+', help="chỉ chạy các case có tên chứa một trong các chuỗi này")
+    parser.add_argument('--quick', action='store_true', help="tối đa 3 lần lặp mỗi case")
+    parser.add_argument('--output', help="tệp JSON ghi kết quả (mặc định in ra stdout)")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="tệp baseline để so sánh")
+    parser.add_argument('--save-baseline', action='store_true', help="ghi kết quả lần này làm baseline")
+    parser.add_argument('--threshold', type=float, default=1.25, help="tỉ lệ trung vị coi là chậm đi")
+    parser.add_argument('--fail-on-regression', action='store_true', help="thoát với mã 1 nếu có case chậm đi")
+    args = parser.parse_args(argv)
+    
+    report = {'environment': environment(), 'results': run_cases(args.only, args.quick)}
+    
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        report['comparison'] = compare(report['results'], baseline, args.threshold)
+        for row in report['comparison']:
+            ratio = f"x{row['ratio']:.2f}" if row['ratio'] is not None else ''
+            print(f"{row['name']:<42} {row['status']:<7} {ratio}", file=sys.stderr)
+    
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    elif not args.save_baseline:
+        print(text)
+    
+    if args.fail_on_regression and baseline and any(row['status'] == 'slower' for row in report['comparison']):
+        sys.exit(1)
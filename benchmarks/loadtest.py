@@ -0,0 +1,159 @@
+# Kiểm thử tải / Concurrent-session load test
+# Mô phỏng nhiều phiên cùng lúc bằng AppTest trong một tiến trình, nên các phiên dùng chung cache
+# (ảnh vòng quay, Figure, hub trình chiếu...) như trên máy chủ thật. Mỗi phiên mở trang rồi bốc thăm
+# vài đội; in ra phân vị độ trễ của từng loại lần chạy lại để ước lượng cỡ máy chủ cần dùng.
+#
+#   python -m benchmarks.loadtest --sessions 200 --concurrency 50
+#   DRAW_TOURNAMENTS=giai.json python -m benchmarks.loadtest --tournaments women men veterans
+#   WHEEL_RENDER_MODE=svg python -m benchmarks.loadtest --draws 1 --output load.json
+#
+# Ở chế độ client, kết quả lượt quay được báo lại như component trình duyệt; ở các chế độ vẽ trên máy chủ
+# lần chạy 'draw' gồm cả thời gian phát lượt quay (SERVER_SPIN_SECONDS).
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from draw_engine.instrument import rss_bytes
+
+from .bench import APP_PATH
+
+PERCENTILES = (50, 90, 99)
+
+
+# AppTest đặt Runtime giả và tùy chọn global.appTest cho mỗi lần chạy rồi xóa đi khi xong, nên các phiên
+# chạy song song sẽ thấy chúng biến mất giữa chừng. Giữ cố định cả hai trong suốt lần kiểm thử tải:
+# tùy chọn luôn bật và Runtime.instance() trả về một Runtime giả dùng chung khi không có lần chạy nào đặt.
+# Mỗi lần chạy AppTest cũng biên dịch lại trang, và compile() song song trong nhiều luồng có thể lỗi
+# (SystemError: AST constructor recursion depth mismatch); dùng một ScriptCache chung như máy chủ thật.
+def pin_app_test_globals():
+    from unittest.mock import MagicMock
+    
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import local_script_runner
+    
+    shared = MagicMock(spec=Runtime)
+    shared.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    shared.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime.instance = classmethod(lambda cls: cls._instance or shared)
+    Runtime.exists = classmethod(lambda cls: True)
+    config.set_option('global.appTest', True)
+    script_cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: script_cache
+
+
+# Một phiên: mở trang, rồi mỗi lượt chạy lại khi rảnh, bấm Bốc thăm và (chế độ client) báo kết quả
+# record(action, ms) được gọi sau mỗi lần chạy lại
+def run_session(tournament, draws, timeout, record):
+    from streamlit.testing.v1 import AppTest
+    
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    if tournament:
+        at.query_params['tournament'] = tournament
+    
+    def timed(action):
+        started = time.perf_counter()
+        at.run()
+        record(action, (time.perf_counter() - started) * 1000)
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+        at.selectbox[0].set_value("vi")  # AppTest cần đặt lại giá trị gốc cho selectbox ngôn ngữ
+    
+    timed('load')
+    for _ in range(draws):
+        if not at.session_state['available_positions']:
+            break
+        timed('rerun')
+        next(b for b in at.button if b.label == 'Bốc thăm').click()
+        timed('draw')
+        pending = at.session_state['pending_spin']
+        if pending and 'end' in pending:
+            at.session_state['spin_wheel'] = {'id': pending['id'], 'angle': pending['end'] % 360}
+            timed('commit')
+
+
+# Phân vị độ trễ (ms) theo loại lần chạy lại
+def summarize(latencies):
+    rows = []
+    for action, values in latencies.items():
+        values = np.asarray(values)
+        row = {'action': action, 'count': len(values), 'mean_ms': float(values.mean()), 'max_ms': float(values.max())}
+        row.update({f'p{p}_ms': float(np.percentile(values, p)) for p in PERCENTILES})
+        rows.append(row)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kiểm thử tải nhiều phiên / Concurrent-session load test")
+    parser.add_argument('--sessions', type=int, default=100, help="tổng số phiên mô phỏng")
+    parser.add_argument('--concurrency', type=int, default=25, help="số phiên chạy cùng lúc")
+    parser.add_argument('--draws', type=int, default=3, help="số đội mỗi phiên bốc thăm")
+    parser.add_argument('--tournaments', nargs='+', default=[None], help="mã giải (?tournament=), chia đều cho các phiên")
+    parser.add_argument('--timeout', type=float, default=120, help="thời gian tối đa một lần chạy lại (giây)")
+    parser.add_argument('--output', help="tệp JSON ghi kết quả")
+    args = parser.parse_args(argv)
+    
+    latencies = {}
+    errors = []
+    lock = threading.Lock()
+    
+    def record(action, ms):
+        with lock:
+            latencies.setdefault(action, []).append(ms)
+    
+    def session(i):
+        try:
+            run_session(args.tournaments[i % len(args.tournaments)], args.draws, args.timeout, record)
+        except Exception as error:
+            with lock:
+                errors.append(f"session {i}: {error}")
+    
+    pin_app_test_globals()
+    rss_before = rss_bytes()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix='load-session') as pool:
+        list(pool.map(session, range(args.sessions)))
+    elapsed = time.perf_counter() - started
+    
+    rows = summarize(latencies)
+    reruns = sum(row['count'] for row in rows)
+    report = {
+        'mode': os.environ.get('WHEEL_RENDER_MODE', 'client'),
+        'sessions': args.sessions,
+        'concurrency': args.concurrency,
+        'tournaments': args.tournaments,
+        'elapsed_s': elapsed,
+        'reruns_per_s': reruns / elapsed,
+        'rss_mb': {'before': rss_before / 2 ** 20, 'after': rss_bytes() / 2 ** 20},
+        'latency': rows,
+        'errors': errors,
+    }
+    
+    header = f"{'action':<8} {'count':>6} " + " ".join(f"{'p' + str(p):>9}" for p in PERCENTILES) + f" {'max':>9}"
+    print(header, file=sys.stderr)
+    for row in rows:
+        print(f"{row['action']:<8} {row['count']:>6} " + " ".join(f"{row[f'p{p}_ms']:>9.1f}" for p in PERCENTILES)
+              + f" {row['max_ms']:>9.1f}", file=sys.stderr)
+    print(f"{args.sessions} phiên ({args.concurrency} cùng lúc) trong {elapsed:.1f}s, {report['reruns_per_s']:.1f} lần chạy lại/s, "
+          f"RSS {report['rss_mb']['before']:.0f} -> {report['rss_mb']['after']:.0f} MB, {len(errors)} lỗi", file=sys.stderr)
+    for error in errors[:5]:
+        print(error, file=sys.stderr)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(report, indent=2, ensure_ascii=False) + '\n')
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == '__main__':
+    main()
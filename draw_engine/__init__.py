@@ -0,0 +1,12 @@
+# Bộ máy bốc thăm dùng chung, không phụ thuộc Streamlit / Headless draw engine
+from .broadcast import BroadcastHub
+from .constraints import DEPARTMENT_RULES, NO_RULES, DrawRules
+from .framecache import FrameCache, quantize_angle
+from .geometry import ARROW_ANGLE, sector_angle, sector_index, sector_indices, selected_position, selected_positions
+from .lod import FULL_DETAIL, LOD_LEVELS, frame_details
+from .prerender import PrerenderBudget, PrerenderedSpin, prerender_spin, prerender_trajectory
+from .scheduler import FrameScheduler
+from .state import (ALL_TEAMS, DrawState, Tournament, allowed_indices, available_teams, commit_draw, draw_remaining, group_names,
+                    init_state, load_tournament, load_tournaments, new_seed, plan_spin, position_group, run_draw,
+                    update_result_table)
+from .trajectory import EASINGS, bounce_frame_count, landing_angles, spin_trajectory
@@ -0,0 +1,42 @@
+# Chạy một lượt bốc thăm đầy đủ không giao diện / Run a full draw without the UI
+#
+#   python -m draw_engine --seed 42
+#   python -m draw_engine --json
+import argparse
+import json
+import time
+
+from .state import DrawState, Tournament, load_tournament, run_draw
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bốc thăm chia bảng / Draw tournament groups")
+    parser.add_argument('--tournament', help="tệp JSON cấu hình giải (đội, bảng, số vị trí mỗi bảng)")
+    parser.add_argument('--teams', nargs='+', default=None, help="danh sách đội (mặc định: các đội của giải)")
+    parser.add_argument('--seed', type=int, default=None, help="hạt giống ngẫu nhiên để tái lập kết quả")
+    parser.add_argument('--no-rules', action='store_true', help="bỏ luật bốc thăm của giải")
+    parser.add_argument('--json', action='store_true', help="in kết quả dạng JSON")
+    args = parser.parse_args(argv)
+    
+    started = time.perf_counter()
+    tournament = load_tournament(args.tournament) if args.tournament else Tournament()
+    state = DrawState(positions=tournament.positions(), result_table=tournament.result_table())
+    run_draw(state, args.teams or tournament.teams, args.seed, None if args.no_rules else tournament.rules)
+    elapsed = time.perf_counter() - started
+    
+    if args.json:
+        print(json.dumps({
+            'results': state.results,
+            'result_table': state.result_table,
+            'wheel_angle': state.wheel_angle,
+            'elapsed_ms': elapsed * 1000,
+        }, ensure_ascii=False, indent=2))
+        return
+    
+    for group, teams in state.result_table.items():
+        print(f"Bảng {group}: " + ", ".join(team or "_____" for team in teams))
+    print(f"Bốc thăm {len(state.results)} đội trong {elapsed * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+# Tài nguyên đi kèm / Bundled assets
+# Âm thanh và font được nhúng thẳng vào trang dưới dạng data URI, mã hóa một lần cho mỗi tiến trình,
+# nên lượt quay không còn phụ thuộc mạng của địa điểm tổ chức hay máy chủ bên thứ ba.
+# Tệp đi kèm nằm trong thư mục assets/ của ứng dụng:
+#   assets/spin.(ogg|mp3|wav), assets/result.(ogg|mp3|wav)
+#   assets/fonts/Montserrat.css (+ các tệp woff2 nó trỏ tới) hoặc assets/fonts/Montserrat-<độ đậm>.woff2
+# Tải đúng âm thanh và font Montserrat (OFL) mà trang vẫn dùng vào assets/ một lần, trên máy có mạng:
+#   python -m draw_engine.assets
+# Chưa có tệp đi kèm thì dùng âm thanh tổng hợp và font hệ thống trong danh sách dự phòng của CSS, nên
+# mặc định trang không tải gì từ bên ngoài. DRAW_REMOTE_ASSETS=1 (tùy chọn) dùng lại các nguồn trên mạng
+# như trước khi chưa có tệp đi kèm (font nạp bằng @import, chặn hiển thị trang cho tới khi tải xong).
+import argparse
+import base64
+import functools
+import io
+import os
+import re
+import urllib.request
+import wave
+
+import numpy as np
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets')
+AUDIO_TYPES = {'.ogg': 'audio/ogg', '.mp3': 'audio/mpeg', '.wav': 'audio/wav'}
+FONT_WEIGHTS = (400, 500, 700)
+SAMPLE_RATE = 11025  # Đủ cho tiếng tách và tiếng chuông, giữ data URI nhỏ (~15 KB)
+REMOTE = os.environ.get('DRAW_REMOTE_ASSETS') == '1'
+
+# Nguồn gốc của âm thanh và font mà trang dùng
+AUDIO_SOURCES = {
+    'spin': "https://tiengdong.com/wp-content/uploads/Am-thanh-vong-quay-chiec-non-ky-dieu-www_tiengdong_com.mp3",
+    'result': "https://www.soundjay.com/buttons/sounds/button-09.mp3",
+}
+FONT_CSS_URL = "https://fonts.googleapis.com/css2?family={family}:wght@{weights}&display=swap"
+FONT_LICENSE_URL = "https://raw.githubusercontent.com/google/fonts/main/ofl/{family}/OFL.txt"
+FONT_SUBSETS = ('vietnamese', 'latin-ext', 'latin')  # Đủ cho tiêu đề và tên đội tiếng Việt / tiếng Anh
+
+
+def data_uri(data, mime):
+    return f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+# Mã hóa mẫu âm thanh [-1, 1] thành WAV PCM 8 bit mono
+def wav_bytes(samples, rate=SAMPLE_RATE):
+    pcm = (np.clip(samples, -1, 1) * 127 + 128).astype(np.uint8)
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(1)
+        wav.setframerate(rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+# Tiếng lách cách của vòng quay: 12 tiếng tách mỗi giây, lặp liền mạch (audio loop)
+def synth_spin_sound(rate=SAMPLE_RATE, ticks_per_second=12, seconds=1.0):
+    t = np.arange(int(rate * seconds)) / rate
+    phase = (t * ticks_per_second) % 1 / ticks_per_second  # thời gian kể từ tiếng tách gần nhất
+    envelope = np.exp(-phase * 350)
+    noise = np.random.default_rng(0).uniform(-1, 1, t.size)
+    return 0.6 * envelope * (0.6 * np.sin(2 * np.pi * 1800 * t) + 0.4 * noise)
+
+
+# Tiếng chuông báo kết quả: hai họa âm tắt dần
+def synth_result_sound(rate=SAMPLE_RATE, seconds=0.8):
+    t = np.arange(int(rate * seconds)) / rate
+    tone = np.sin(2 * np.pi * 880 * t) + 0.5 * np.sin(2 * np.pi * 1320 * t)
+    attack = np.clip(t * 200, 0, 1)
+    return 0.5 * tone * attack * np.exp(-t * 5)
+
+
+SYNTHESIZED_AUDIO = {'spin': synth_spin_sound, 'result': synth_result_sound}
+
+
+# Tệp đi kèm đầu tiên có tên name và phần mở rộng trong types (None nếu không có)
+def bundled_file(name, types):
+    for extension in types:
+        path = os.path.join(ASSET_DIR, name + extension)
+        if os.path.isfile(path):
+            return path, extension
+    return None, None
+
+
+# Địa chỉ âm thanh 'spin' hoặc 'result': tệp đi kèm (data URI) nếu có, nếu không thì âm thanh tổng hợp
+# (hoặc nguồn trên mạng khi bật DRAW_REMOTE_ASSETS)
+@functools.lru_cache(maxsize=None)
+def audio_uri(name):
+    path, extension = bundled_file(name, AUDIO_TYPES)
+    if path:
+        with open(path, 'rb') as f:
+            return data_uri(f.read(), AUDIO_TYPES[extension])
+    if REMOTE:
+        return AUDIO_SOURCES[name]
+    return data_uri(wav_bytes(SYNTHESIZED_AUDIO[name]()), 'audio/wav')
+
+
+# Khối <style> khai báo font Montserrat từ các tệp đi kèm; không có tệp thì trả về chuỗi rỗng để CSS dùng
+# các font hệ thống trong danh sách dự phòng (hoặc nạp từ Google Fonts khi bật DRAW_REMOTE_ASSETS)
+@functools.lru_cache(maxsize=None)
+def font_face_css(family='Montserrat'):
+    stylesheet = os.path.join(ASSET_DIR, 'fonts', f'{family}.css')
+    if os.path.isfile(stylesheet):
+        return f"<style>{inline_font_urls(stylesheet)}</style>"
+    
+    faces = []
+    for weight in FONT_WEIGHTS:
+        path, _ = bundled_file(os.path.join('fonts', f'{family}-{weight}'), ('.woff2',))
+        if path:
+            with open(path, 'rb') as f:
+                src = data_uri(f.read(), 'font/woff2')
+            faces.append(f"@font-face {{ font-family: '{family}'; font-weight: {weight}; "
+                         f"font-display: swap; src: url({src}) format('woff2'); }}")
+    if faces:
+        return f"<style>{''.join(faces)}</style>"
+    if REMOTE:
+        return f"<style>@import url('{font_css_url(family)}');</style>"
+    return ''
+
+
+def font_css_url(family='Montserrat'):
+    return FONT_CSS_URL.format(family=family.replace(' ', '+'), weights=';'.join(map(str, FONT_WEIGHTS)))
+
+
+# Thay url(<tệp>) trong stylesheet font đi kèm bằng data URI của tệp đó (cùng thư mục)
+def inline_font_urls(stylesheet):
+    directory = os.path.dirname(stylesheet)
+    
+    def inline(match):
+        with open(os.path.join(directory, match.group(1)), 'rb') as f:
+            return f"url({data_uri(f.read(), 'font/woff2')})"
+    
+    with open(stylesheet, encoding='utf-8') as f:
+        return re.sub(r"url\(([^)]+\.woff2)\)", inline, f.read())
+
+
+# Tải về và ghi ra đĩa, trả về nội dung (Google Fonts chỉ trả woff2 cho trình duyệt hiện đại)
+def download(url, path=None):
+    request = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
+                                                                 'AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120 Safari/537.36'})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        data = response.read()
+    if path:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+    return data
+
+
+# Tải âm thanh và font vào thư mục assets để đưa vào kho mã cùng ứng dụng.
+# Font: stylesheet của Google Fonts chỉ giữ các bộ ký tự FONT_SUBSETS, url được đổi thành tệp cùng thư mục.
+def fetch_assets(directory=ASSET_DIR, family='Montserrat'):
+    written = []
+    for name, url in AUDIO_SOURCES.items():
+        path = os.path.join(directory, name + os.path.splitext(url)[1])
+        download(url, path)
+        written.append(path)
+    
+    fonts = os.path.join(directory, 'fonts')
+    css = download(font_css_url(family)).decode('utf-8')
+    faces = []
+    for subset, face in re.findall(r"/\* ([\w-]+) \*/\s*(@font-face \{.*?\})", css, re.S):
+        if subset not in FONT_SUBSETS:
+            continue
+        weight = re.search(r"font-weight: (\d+)", face).group(1)
+        filename = f"{family}-{weight}-{subset}.woff2"
+        download(re.search(r"url\((\S+?\.woff2)\)", face).group(1), os.path.join(fonts, filename))
+        faces.append(f"/* {subset} */\n" + re.sub(r"url\(\S+?\.woff2\)", f"url({filename})", face))
+        written.append(os.path.join(fonts, filename))
+    
+    stylesheet = os.path.join(fonts, f'{family}.css')
+    with open(stylesheet, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(faces) + '\n')
+    license_path = os.path.join(fonts, 'OFL.txt')
+    download(FONT_LICENSE_URL.format(family=family.lower().replace(' ', '')), license_path)
+    return written + [stylesheet, license_path]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tải âm thanh và font đi kèm / Fetch bundled sounds and fonts")
+    parser.add_argument('--dir', default=ASSET_DIR, help="thư mục assets của ứng dụng")
+    args = parser.parse_args(argv)
+    
+    for path in fetch_assets(args.dir):
+        print(f"{os.path.relpath(path, args.dir)}: {os.path.getsize(path) / 1024:.1f} KB")
+
+
+if __name__ == '__main__':
+    main()
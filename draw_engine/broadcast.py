@@ -0,0 +1,44 @@
+# Trình chiếu chung một lượt bốc thăm / Shared broadcast state
+# Một trạng thái bốc thăm duy nhất cho cả tiến trình: người điều khiển ghi, khán giả chỉ đọc.
+# Mỗi thay đổi tăng số phiên bản và đánh thức các phiên đang chờ; ảnh vòng quay và HTML bảng kết quả
+# nằm trong các cache dùng chung của tiến trình nên cũng chỉ được dựng một lần cho mọi người xem.
+import threading
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from .state import init_state
+
+
+class BroadcastHub:
+    def __init__(self, tournament=None):
+        self.tournament = tournament
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self.version = 0
+        self.state = SimpleNamespace()
+        init_state(self.state, tournament)
+    
+    # Thay đổi trạng thái chung: giữ khóa trong khi sửa, sau đó tăng phiên bản và báo cho khán giả
+    @contextmanager
+    def update(self):
+        with self._changed:
+            yield self.state
+            self._publish()
+    
+    # Bắt đầu lại từ đầu với trạng thái trống; xóa tại chỗ để các phiên đang giữ tham chiếu
+    # tới self.state (ví dụ fragment đang chạy lại) vẫn thấy trạng thái mới
+    def reset(self):
+        with self._changed:
+            self.state.__dict__.clear()
+            init_state(self.state, self.tournament)
+            self._publish()
+    
+    def _publish(self):
+        self.version += 1
+        self._changed.notify_all()
+    
+    # Chờ đến khi phiên bản khác version (hoặc hết thời gian chờ), trả về phiên bản hiện tại
+    def wait_for_change(self, version, timeout=None):
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout)
+            return self.version
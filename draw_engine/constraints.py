@@ -0,0 +1,206 @@
+# Ràng buộc bốc thăm / Draw constraints
+# Cấm một số cặp đội chung bảng (cùng bộ phận), mỗi bảng nhiều nhất một đội của mỗi nhóm hạt giống
+# (pot). Trước mỗi lượt quay, tính các vị trí mà nếu đội được xếp vào thì phần còn lại của lượt
+# bốc thăm vẫn xếp được - vòng quay chỉ dừng ở các vị trí đó nên không bao giờ rơi vào ngõ cụt.
+#
+# Các ô trong cùng một bảng như nhau đối với ràng buộc, nên bài toán chỉ là xếp đội vào bảng
+# (tô màu đồ thị xung đột có giới hạn sức chứa). Đội và bảng được biểu diễn bằng bitset (int),
+# tìm kiếm quay lui chọn đội ít lựa chọn nhất trước, gộp các bảng giống hệt nhau và ghi nhớ
+# các trạng thái đã biết là không xếp được.
+from itertools import combinations
+
+from .state import ALL_TEAMS, position_group
+
+MAX_SEARCH_NODES = 2000  # Giới hạn nút tìm kiếm khi thử từng bảng (ngoài lời giải đầu tiên)
+
+
+class DrawRules:
+    # forbidden: các cặp (hoặc nhóm) đội không được chung bảng
+    # pots: các nhóm đội, mỗi bảng nhiều nhất một đội của mỗi nhóm
+    # seeds: các đội hạt giống, mỗi bảng nhiều nhất một đội (một pot riêng)
+    def __init__(self, forbidden=(), pots=(), seeds=()):
+        self.forbidden = [tuple(teams) for teams in forbidden]
+        self.pots = [tuple(pot) for pot in pots]
+        self.seeds = tuple(seeds)
+        
+        self.conflicts = {}
+        for teams in self.forbidden + self.pots + [self.seeds]:
+            for a, b in combinations(teams, 2):
+                self.conflicts.setdefault(a, set()).add(b)
+                self.conflicts.setdefault(b, set()).add(a)
+    
+    def __bool__(self):
+        return bool(self.conflicts)
+    
+    # Các vị trí còn trống mà team có thể nhận (giữ nguyên thứ tự của available_positions).
+    # Một lời giải đầy đủ cho biết ngay một bảng hợp lệ; các bảng khác được thử với giới hạn
+    # max_nodes nút tìm kiếm - bảng chưa chứng minh được là xếp được thì không được đưa ra,
+    # nên giới hạn chỉ làm giảm lựa chọn chứ không bao giờ dẫn vào ngõ cụt.
+    def allowed_positions(self, state, team, teams=ALL_TEAMS, max_nodes=MAX_SEARCH_NODES):
+        if not self.conflicts:
+            return list(state.available_positions)
+        
+        search = _Search(self, state, team, teams)
+        if not any(search.neighbours):
+            return list(state.available_positions)  # Các đội bị ràng buộc không có mặt trong giải này
+        first = search.first_group()
+        if first is None:
+            return []
+        # Bảng giống hệt nhau (cùng thành viên, cùng sức chứa) cho cùng kết quả: chỉ thử một lần
+        verdicts = {search.group_key(first): True}
+        allowed = set()
+        for group in sorted({position_group(position) for position in state.available_positions}):
+            key = search.group_key(group)
+            if key not in verdicts:
+                verdicts[key] = search.group_allowed(group, max_nodes)
+            if verdicts[key]:
+                allowed.add(group)
+        return [position for position in state.available_positions if position_group(position) in allowed]
+    
+    # Phần còn lại của lượt bốc thăm có xếp được không
+    def feasible(self, state, teams=ALL_TEAMS):
+        return _Search(self, state, None, teams).solve()
+
+
+class _SearchExhausted(Exception):
+    pass
+
+
+class _Search:
+    def __init__(self, rules, state, team, teams):
+        placed = {t: position_group(position) for t, position in state.results.items()}
+        remaining = [t for t in teams if t not in placed and t != team]
+        names = list(placed) + remaining + ([team] if team is not None and team not in placed else [])
+        index = {name: i for i, name in enumerate(names)}
+        
+        self.team = index.get(team)
+        self.neighbours = [[] for _ in names]
+        for name, others in rules.conflicts.items():
+            if name in index:
+                self.neighbours[index[name]] = [index[other] for other in others if other in index]
+        
+        # Bảng được đánh số; blocked[t] là bitset các bảng mà đội t không được vào
+        self.groups = sorted({position_group(position) for position in state.positions})
+        self.group_index = {group: g for g, group in enumerate(self.groups)}
+        self.members = [0] * len(self.groups)
+        self.capacity = [0] * len(self.groups)
+        for position in state.available_positions:
+            self.capacity[self.group_index[position_group(position)]] += 1
+        self.open = sum(1 << g for g, capacity in enumerate(self.capacity) if capacity)
+        self.blocked = [0] * len(names)
+        for name, group in placed.items():
+            self._assign(index[name], self.group_index[group], count=False)
+        
+        self.remaining = [index[name] for name in remaining]
+        self.failed = set()
+        self.nodes = 0
+        self.max_nodes = None
+        self.found_group = None
+    
+    # Xếp đội vào bảng; trả về các đội vừa bị chặn khỏi bảng đó để hoàn tác
+    def _assign(self, team, g, count=True):
+        self.members[g] |= 1 << team
+        if count:
+            self.capacity[g] -= 1
+            if not self.capacity[g]:
+                self.open &= ~(1 << g)
+        bit = 1 << g
+        changed = [other for other in self.neighbours[team] if not self.blocked[other] & bit]
+        for other in changed:
+            self.blocked[other] |= bit
+        return changed
+    
+    def _unassign(self, team, g, changed):
+        self.members[g] &= ~(1 << team)
+        if not self.capacity[g]:
+            self.open |= 1 << g
+        self.capacity[g] += 1
+        for other in changed:
+            self.blocked[other] &= ~(1 << g)
+    
+    # Bảng của team trong một lời giải đầy đủ bất kỳ (None nếu không xếp được)
+    def first_group(self):
+        if self.solve([self.team] + self.remaining):
+            return self.groups[self.found_group]
+        return None
+    
+    def group_key(self, group):
+        g = self.group_index[group]
+        return self.members[g], self.capacity[g]
+    
+    # Xếp team vào group rồi kiểm tra phần còn lại; nhiều bảng dùng chung bộ ghi nhớ
+    def group_allowed(self, group, max_nodes=None):
+        g = self.group_index[group]
+        if not self.open & ~self.blocked[self.team] & (1 << g):
+            return False
+        changed = self._assign(self.team, g)
+        self.nodes, self.max_nodes = 0, max_nodes
+        try:
+            return self.solve()
+        except _SearchExhausted:
+            return False
+        finally:
+            self.max_nodes = None
+            self._unassign(self.team, g, changed)
+    
+    def solve(self, remaining=None):
+        remaining = self.remaining if remaining is None else remaining
+        if sum(self.capacity) < len(remaining):
+            return False
+        return self._place(list(remaining))
+    
+    def _place(self, remaining):
+        if not remaining:
+            return True
+        key = tuple(sorted(zip(self.members, self.capacity)))
+        if key in self.failed:
+            return False
+        self.nodes += 1
+        if self.max_nodes and self.nodes > self.max_nodes:
+            raise _SearchExhausted
+        
+        # Đội ít lựa chọn nhất trước (MRV); đội không còn bảng nào thì dừng ngay
+        best, best_options, best_count = None, 0, None
+        for team in remaining:
+            options = self.open & ~self.blocked[team]
+            count = options.bit_count()
+            if best_count is None or count < best_count:
+                best, best_options, best_count = team, options, count
+                if count <= 1:
+                    break
+        
+        rest = [team for team in remaining if team != best]
+        seen = set()
+        while best_options:
+            bit = best_options & -best_options
+            best_options ^= bit
+            g = bit.bit_length() - 1
+            
+            # Hai bảng cùng thành viên và cùng sức chứa là như nhau: chỉ thử một
+            if (self.members[g], self.capacity[g]) in seen:
+                continue
+            seen.add((self.members[g], self.capacity[g]))
+            
+            changed = self._assign(best, g)
+            ok = self._place(rest)
+            self._unassign(best, g, changed)
+            if ok:
+                if best == self.team:
+                    self.found_group = g
+                return True
+        self.failed.add(key)
+        return False
+
+
+# Luật từ cấu hình giải: {"forbidden": [[đội, đội], ...], "pots": [[đội, ...], ...], "seeds": [đội, ...]}
+# (không khai báo thì không có ràng buộc)
+def rules_from_config(config):
+    return DrawRules(config.get('forbidden', ()), config.get('pots', ()), config.get('seeds', ()))
+
+
+# Luật của giải mặc định: hai đội cùng bộ phận không chung bảng
+DEPARTMENT_RULES = DrawRules(forbidden=[
+    ("WW P1", "WW P2"),
+    ("FINISHING P1", "FINISHING P2"),
+])
+NO_RULES = DrawRules()
@@ -0,0 +1,61 @@
+# Cache ảnh vòng quay đã mã hóa / Encoded wheel frame cache
+# Giữ tối đa maxsize ảnh PNG theo khóa (vị trí, góc đã lượng tử, dpi), bỏ ảnh lâu không dùng
+# nhất khi đầy. Dùng chung giữa các phiên nên mọi thao tác đều nằm trong khóa.
+import threading
+from collections import OrderedDict
+
+from .wheel import WHEEL_RASTER_STEPS
+
+# Bước lượng tử góc: bằng độ phân giải góc của ảnh raster nên ảnh không đổi sau khi làm tròn
+ANGLE_STEP = 360 / WHEEL_RASTER_STEPS
+
+
+# Làm tròn góc về bội số của step trong [0, 360)
+def quantize_angle(angle, step=ANGLE_STEP):
+    return round(float(angle) % 360 / step) * step % 360
+
+
+class FrameCache:
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    # Lấy ảnh theo khóa; nếu chưa có thì gọi build() rồi lưu lại
+    def get(self, key, build):
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+                self.hits += 1
+                return frame
+            self.misses += 1
+        
+        # Vẽ ngoài khóa để các phiên khác vẫn lấy được ảnh đã có trong lúc chờ
+        frame = build()
+        with self._lock:
+            self._frames[key] = frame
+            self._frames.move_to_end(key)
+            while len(self._frames) > self.maxsize:
+                self._frames.popitem(last=False)
+        return frame
+    
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    # Số liệu thống kê: số ảnh, tổng dung lượng, lượt trúng/trượt
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'frames': len(self._frames),
+                'bytes': sum(len(frame) for frame in self._frames.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0,
+            }
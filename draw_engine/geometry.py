@@ -0,0 +1,34 @@
+# Hình học vòng quay / Wheel geometry
+# Ánh xạ góc quay sang phần tử nằm dưới mũi tên bằng phép tính trực tiếp,
+# không cần vẽ vòng quay. Phần tử i chiếm cung [angle + i * 360/n, angle + (i + 1) * 360/n).
+import numpy as np
+
+# Mũi tên nằm ở đỉnh vòng quay (90° theo chiều ngược kim đồng hồ, như matplotlib)
+ARROW_ANGLE = 90
+
+
+# Góc quay của vòng quay để phần tử index nằm dưới mũi tên
+# offset trong [0, 1): vị trí dừng bên trong phần tử (0.5 = chính giữa)
+def sector_angle(index, n_sectors, offset=0.5):
+    return (ARROW_ANGLE - (np.asarray(index) + offset) * 360 / n_sectors) % 360
+
+
+# Chỉ số phần tử nằm dưới mũi tên khi vòng quay ở góc angle (độ) - O(1)
+def sector_index(angle, n_sectors):
+    return int(((ARROW_ANGLE - angle) % 360) * n_sectors // 360) % n_sectors
+
+
+# Phiên bản vector: chỉ số phần tử cho cả mảng góc quay
+def sector_indices(angles, n_sectors):
+    angles = np.asarray(angles, dtype=float)
+    return (((ARROW_ANGLE - angles) % 360) * n_sectors // 360).astype(np.intp) % n_sectors
+
+
+# Vị trí (nhãn) nằm dưới mũi tên
+def selected_position(positions, angle):
+    return positions[sector_index(angle, len(positions))]
+
+
+# Phiên bản vector: mảng vị trí cho cả mảng góc quay
+def selected_positions(positions, angles):
+    return np.asarray(positions, dtype=object)[sector_indices(angles, len(positions))]
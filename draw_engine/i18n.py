@@ -0,0 +1,21 @@
+# Từ điển đa ngôn ngữ đã biên dịch / Compiled translation catalog
+# Mỗi chuỗi được biên dịch một lần cho mỗi ngôn ngữ thành hàm định dạng theo placeholder có tên
+# ("Kết quả: {team} → {position}"), nên lấy văn bản chỉ còn một lần tra dict và không phụ thuộc thứ tự tham số.
+import string
+
+
+# Hàm định dạng của một chuỗi: chuỗi không có placeholder được trả thẳng, không phải phân tích lại
+def compile_text(text):
+    fields = [name for _, name, _, _ in string.Formatter().parse(text) if name is not None]
+    if not fields:
+        return lambda **kwargs: text
+    if not all(name.isidentifier() for name in fields):
+        raise ValueError(f"placeholder phải có tên, ví dụ {{team}}: {text!r}")
+    return text.format
+
+
+# {ngôn ngữ: {khóa: hàm định dạng}} từ {khóa: {ngôn ngữ: chuỗi}}
+def compile_catalog(translations):
+    languages = {language for texts in translations.values() for language in texts}
+    return {language: {key: compile_text(texts[language]) for key, texts in translations.items() if language in texts}
+            for language in languages}
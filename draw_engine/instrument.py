@@ -0,0 +1,118 @@
+# Đo thời gian các bước nóng / Hot-path instrumentation
+# Mỗi lần chạy lại trang dùng một Profiler: các bước được bọc trong span có tên, kết quả
+# xem ở thanh bên gỡ lỗi hoặc ghi thêm vào tệp JSONL để phân tích sau.
+import json
+import os
+import resource
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+
+class Profiler:
+    def __init__(self):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started = time.perf_counter()
+        self.timestamp = time.time()
+        self.spans = []
+        self.thread = threading.get_ident()
+    
+    # Đo một bước; attrs là thông tin kèm theo (chỉ số khung hình, chế độ vẽ...)
+    # Chỉ đo trên luồng của lần chạy đã tạo Profiler: công việc ở luồng nền (vẽ trước lượt quay) có thể
+    # kéo dài sang lần chạy sau, ghi vào đây sẽ bị tính nhầm cho lần chạy đã xuất hoặc bị mất
+    @contextmanager
+    def span(self, name, **attrs):
+        if threading.get_ident() != self.thread:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000, start, **attrs)
+    
+    # Ghi một bước đã đo sẵn (ms)
+    def record(self, name, ms, start=None, **attrs):
+        offset = (start if start is not None else time.perf_counter()) - self.started
+        self.spans.append(dict(attrs, name=name, ms=ms, offset_ms=offset * 1000))
+    
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+    
+    # Tổng hợp theo tên bước: số lần, tổng và lớn nhất (ms), xếp theo tổng giảm dần
+    def summary(self):
+        totals = {}
+        for span in list(self.spans):
+            row = totals.setdefault(span['name'], {'span': span['name'], 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            row['count'] += 1
+            row['total_ms'] += span['ms']
+            row['max_ms'] = max(row['max_ms'], span['ms'])
+        return sorted(totals.values(), key=lambda row: row['total_ms'], reverse=True)
+
+
+# Ghi các span ra tệp JSONL, mỗi dòng một span kèm mã lần chạy và thời điểm
+class JsonlExporter:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+    
+    def export(self, profiler, **context):
+        lines = [json.dumps(dict(context, run=profiler.run_id, ts=profiler.timestamp, **span), ensure_ascii=False)
+                 for span in list(profiler.spans)]
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(''.join(line + '\n' for line in lines))
+
+
+# Bộ nhớ tiến trình / Process memory
+# RSS hiện tại (byte) đọc từ /proc; nơi không có /proc thì dùng đỉnh RSS của getrusage
+def rss_bytes():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+# Theo dõi bộ nhớ của máy chủ chạy lâu: lịch sử RSS theo số phiên đang mở và, khi bật tracemalloc,
+# các dòng mã cấp phát tăng nhiều nhất so với ảnh chụp đầu tiên
+class MemoryTracker:
+    def __init__(self, trace=False, frames=1, history=500):
+        self.samples = deque(maxlen=history)
+        self.baseline = None
+        self._lock = threading.Lock()
+        if trace:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            self.baseline = self.snapshot()
+    
+    # Ghi một mẫu RSS; sessions là số phiên đang mở (None nếu không biết)
+    def sample(self, sessions=None, **attrs):
+        rss = rss_bytes()
+        row = dict(attrs, ts=time.time(), rss_mb=rss / 2 ** 20, sessions=sessions,
+                   rss_per_session_mb=rss / 2 ** 20 / sessions if sessions else None)
+        with self._lock:
+            self.samples.append(row)
+        return row
+    
+    def history(self):
+        with self._lock:
+            return list(self.samples)
+    
+    # Ảnh chụp tracemalloc, bỏ qua cấp phát của chính tracemalloc và bộ nạp module
+    def snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        ])
+    
+    # Các dòng mã tăng bộ nhớ nhiều nhất kể từ ảnh chụp đầu (rỗng nếu không bật tracemalloc)
+    def top_growth(self, limit=10):
+        if self.baseline is None or not tracemalloc.is_tracing():
+            return []
+        stats = self.snapshot().compare_to(self.baseline, 'lineno')[:limit]
+        return [{'location': str(stat.traceback), 'size_kb': stat.size / 1024, 'diff_kb': stat.size_diff / 1024,
+                 'count': stat.count, 'count_diff': stat.count_diff} for stat in stats]
@@ -0,0 +1,167 @@
+# Nhật ký bốc thăm / Append-only draw journal
+# Mỗi kết quả đã ghi nhận được nối vào tệp JSONL (mỗi dòng một sự kiện) và fsync ngay, nên khi
+# tải lại trang, mất kết nối hay khởi động lại máy chủ thì trạng thái được dựng lại từ nhật ký
+# mà không phải bốc lại. Sự kiện "reset" đánh dấu bắt đầu một lượt bốc thăm mới.
+#
+# Mỗi lượt quay ghi kèm hạt giống ngẫu nhiên (seed) và góc bắt đầu, đủ để tính lại đúng quỹ đạo
+# và phát lại hoạt ảnh:
+#
+#   python -m draw_engine.journal draw.jsonl            # dựng lại trạng thái, in bảng kết quả
+#   python -m draw_engine.journal draw.jsonl --verify   # tính lại từng lượt quay từ seed và so khớp
+import argparse
+import json
+import os
+import threading
+import time
+
+from .state import ALL_TEAMS, DrawState, commit_draw, plan_spin
+from .trajectory import spin_trajectory
+
+
+class DrawJournal:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+    
+    # Nối một sự kiện và chỉ trả về khi đã nằm trên đĩa
+    def append(self, event, **fields):
+        line = json.dumps(dict(fields, event=event, ts=time.time()), ensure_ascii=False) + '\n'
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+    
+    # Một đội đã được ghi nhận. targeted: vị trí đích được chọn theo đội và luật (plan_spin có team)
+    def record_draw(self, team, position, final_angle, seed=None, start_angle=None, targeted=False):
+        self.append('draw', team=team, position=position, final_angle=float(final_angle),
+                    seed=None if seed is None else int(seed),
+                    start_angle=None if start_angle is None else float(start_angle), targeted=targeted)
+    
+    def record_reset(self):
+        self.append('reset')
+    
+    # Các lượt bốc thăm kể từ lần reset gần nhất. Dòng cuối bị cắt dở (máy tắt khi đang ghi) được bỏ qua.
+    def draws(self):
+        if not os.path.exists(self.path):
+            return []
+        draws = []
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('event') == 'reset':
+                    draws = []
+                elif record.get('event') == 'draw':
+                    draws.append(record)
+        return draws
+
+
+# Tệp nhật ký của một giải khi máy chủ phục vụ nhiều giải: "{tournament}" trong đường dẫn được thay
+# bằng mã giải, nếu không có thì thêm mã giải trước phần mở rộng (draw.jsonl -> draw-men.jsonl)
+def journal_path(path, tournament_id):
+    if '{tournament}' in path:
+        return path.replace('{tournament}', tournament_id)
+    root, extension = os.path.splitext(path)
+    return f"{root}-{tournament_id}{extension}"
+
+
+# Trạng thái trống theo cấu hình giải
+def fresh_state(tournament=None):
+    if tournament is None:
+        return DrawState()
+    return DrawState(positions=tournament.positions(), result_table=tournament.result_table())
+
+
+# Bản ghi còn áp dụng được cho trạng thái hiện tại: đội thuộc giải, chưa có vị trí và vị trí còn trống
+def applicable(state, record, teams):
+    return (record['team'] in teams and record['team'] not in state.results
+            and record['position'] in state.available_positions)
+
+
+# Dựng lại trạng thái từ nhật ký (tua nhanh, không hoạt ảnh) rồi ghi đè các khóa bốc thăm của state.
+# Bản ghi không còn hợp lệ với cấu hình hiện tại (đội không thuộc giải, đội đã có vị trí, vị trí đã hết) được bỏ qua.
+def restore(state, draws, tournament=None):
+    scratch = fresh_state(tournament)
+    teams = tournament.teams if tournament is not None else ALL_TEAMS
+    for record in draws:
+        if not applicable(scratch, record, teams):
+            continue
+        commit_draw(scratch, record['team'], record['position'], record['final_angle'])
+    
+    for key in ('positions', 'available_positions', 'results', 'used_teams', 'result_table', 'wheel_angle'):
+        setattr(state, key, getattr(scratch, key))
+    return state
+
+
+# Phát lại: tính lại quỹ đạo từng lượt quay từ seed đã ghi (trajectory_options đổi số khung hình,
+# nảy...; điểm dừng chỉ phụ thuộc seed). Lượt nào tính lại không ra đúng vị trí đã ghi (thiếu seed,
+# luật đã đổi) thì dựng quỹ đạo tới đúng vị trí đó (reproduced=False). Bản ghi bị bỏ qua như restore.
+# Trả về danh sách lượt quay như draw_remaining.
+def replay_spins(draws, tournament=None, rules=None, teams=ALL_TEAMS, **trajectory_options):
+    state = fresh_state(tournament)
+    spins = []
+    for record in draws:
+        team, position = record['team'], record['position']
+        if not applicable(state, record, teams):
+            continue
+        positions = list(state.available_positions)
+        start_angle = state.wheel_angle
+        
+        angles = None
+        reproduced = False
+        if record.get('seed') is not None:
+            targeted = record.get('targeted')
+            planned, angles = plan_spin(state, record['seed'], team if targeted else None,
+                                        rules if targeted else None, teams, **trajectory_options)
+            reproduced = planned == position
+            if not reproduced:
+                angles = None
+        if angles is None:
+            angles = spin_trajectory(start_angle, positions.index(position), len(positions), **trajectory_options)
+        
+        commit_draw(state, team, position, angles[-1])
+        spins.append({
+            'team': team,
+            'position': position,
+            'positions': positions,
+            'start_angle': start_angle,
+            'angles': angles,
+            'seed': record.get('seed'),
+            'reproduced': reproduced,
+        })
+    return spins
+
+
+def main(argv=None):
+    from .state import Tournament, load_tournament
+    
+    parser = argparse.ArgumentParser(description="Dựng lại lượt bốc thăm từ nhật ký / Rebuild a draw from its journal")
+    parser.add_argument('path', help="tệp nhật ký JSONL")
+    parser.add_argument('--tournament', help="tệp JSON cấu hình giải")
+    parser.add_argument('--verify', action='store_true', help="tính lại từng lượt quay từ seed và so khớp vị trí")
+    args = parser.parse_args(argv)
+    
+    tournament = load_tournament(args.tournament) if args.tournament else Tournament()
+    started = time.perf_counter()
+    draws = DrawJournal(args.path).draws()
+    state = restore(DrawState(), draws, tournament)
+    elapsed = time.perf_counter() - started
+    
+    for group, teams in state.result_table.items():
+        print(f"Bảng {group}: " + ", ".join(team or "_____" for team in teams))
+    print(f"Dựng lại {len(state.results)} đội từ {len(draws)} bản ghi trong {elapsed * 1000:.2f} ms")
+    
+    if args.verify:
+        spins = replay_spins(draws, tournament, tournament.rules, tournament.teams)
+        reproduced = sum(spin['reproduced'] for spin in spins)
+        print(f"Tính lại từ seed đúng {reproduced}/{len(spins)} lượt quay")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+# Mức chi tiết khung hình theo tốc độ quay / Level of detail for spin frames
+# Khi vòng quay còn nhanh thì không ai đọc được nhãn: khung hình được vẽ nhỏ hơn và bỏ nhãn,
+# chi tiết tăng dần khi vòng quay chậm lại, khung hình cuối (đứng yên) luôn đầy đủ.
+import numpy as np
+
+# (tốc độ tối thiểu - độ mỗi khung hình, tỉ lệ độ phân giải, có vẽ nhãn), xếp từ nhanh đến chậm
+LOD_LEVELS = (
+    (90, 0.25, False),
+    (20, 0.5, False),
+    (0, 1.0, True),
+)
+FULL_DETAIL = (1.0, True)
+
+
+# Mức chi tiết (tỉ lệ, nhãn) cho từng khung hình; angles là góc liên tục (chưa chia dư)
+def frame_details(start_angle, angles, levels=LOD_LEVELS):
+    speeds = np.abs(np.diff(np.concatenate([[start_angle], angles])))
+    details = []
+    for speed in speeds:
+        for min_speed, scale, labels in levels:
+            if speed >= min_speed:
+                details.append((scale, labels))
+                break
+        else:
+            details.append(FULL_DETAIL)
+    
+    # Khung hình dừng lại luôn ở chất lượng đầy đủ
+    if details:
+        details[-1] = FULL_DETAIL
+    return details
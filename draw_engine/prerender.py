@@ -0,0 +1,99 @@
+# Vẽ trước lượt quay tiếp theo / Background pre-rendering of the next spin
+# Quỹ đạo chỉ phụ thuộc góc hiện tại và vị trí đích ngẫu nhiên, nên có thể tính ngay khi lượt
+# trước kết thúc và vẽ các khung hình ở nền trong lúc người điều khiển còn đang chọn đội.
+# Vị trí đích được rút độc lập với đội được chọn nên phân phối kết quả không thay đổi.
+import threading
+import weakref
+from collections import OrderedDict
+
+from .lod import LOD_LEVELS, frame_details
+from .state import new_seed, plan_spin
+
+
+class PrerenderedSpin:
+    def __init__(self, positions, start_angle, position, angles, details, frames, seed=None):
+        self.seed = seed
+        self.positions = tuple(positions)
+        self.start_angle = start_angle
+        self.position = position
+        self.angles = angles
+        self.details = details
+        self.frames = frames
+    
+    # Kế hoạch chỉ còn dùng được khi vòng quay chưa thay đổi kể từ lúc tính (và chưa bị giải phóng)
+    def matches(self, state):
+        return (self.frames is not None and self.positions == tuple(state.available_positions)
+                and self.start_angle == state.wheel_angle)
+    
+    # Ảnh đã mã hóa của khung hình thứ i (chờ nếu luồng nền chưa vẽ xong)
+    def frame(self, i):
+        return self.frames[i].result()
+    
+    def cancel(self):
+        for future in self.frames or []:
+            future.cancel()
+    
+    # Bỏ các khung hình đã vẽ; phiên giữ kế hoạch này sẽ tính lại lượt quay khi cần
+    def release(self):
+        self.cancel()
+        self.frames = None
+    
+    # Số byte ảnh đã vẽ xong mà kế hoạch đang giữ
+    def nbytes(self):
+        return sum(len(future.result()) for future in self.frames or []
+                   if future.done() and not future.cancelled() and future.exception() is None)
+
+
+# Giới hạn số lượt quay vẽ trước còn giữ khung hình trong cả tiến trình: mỗi tab đang mở giữ một lượt
+# (vài MB ảnh ở chế độ figure), nên khi vượt max_spins thì lượt cũ nhất bị giải phóng.
+# Chỉ giữ tham chiếu yếu để phiên đã đóng không bị giữ lại trong bộ nhớ.
+class PrerenderBudget:
+    def __init__(self, max_spins=8):
+        self.max_spins = max_spins
+        self._spins = OrderedDict()  # id -> weakref
+        self._lock = threading.Lock()
+        self.released = 0
+    
+    def add(self, spin):
+        with self._lock:
+            self._spins = OrderedDict((key, ref) for key, ref in self._spins.items() if ref() is not None)
+            self._spins[id(spin)] = weakref.ref(spin)
+            evicted = []
+            while len(self._spins) > self.max_spins:
+                evicted.append(self._spins.popitem(last=False)[1]())
+            self.released += len(evicted)
+        
+        for old in evicted:
+            if old is not None:
+                old.release()
+        return spin
+    
+    # Lượt quay được lấy ra để phát thì không còn bị giải phóng giữa chừng
+    def discard(self, spin):
+        with self._lock:
+            self._spins.pop(id(spin), None)
+    
+    def stats(self):
+        with self._lock:
+            spins = [ref() for ref in self._spins.values()]
+        spins = [spin for spin in spins if spin is not None]
+        return {'spins': len(spins), 'mb': sum(spin.nbytes() for spin in spins) / 2 ** 20, 'released': self.released}
+
+
+# Gửi các khung hình của một quỹ đạo đã biết (góc liên tục, chưa chia dư) cho executor
+# render(positions, angle, scale, labels) trả về ảnh; mức chi tiết lấy theo tốc độ quay (lod_levels)
+def prerender_trajectory(executor, render, positions, start_angle, position, angles, lod_levels=LOD_LEVELS, seed=None):
+    details = frame_details(start_angle, angles, lod_levels)
+    angles = angles % 360
+    frames = [executor.submit(render, positions, angle, *detail) for angle, detail in zip(angles, details)]
+    return PrerenderedSpin(positions, start_angle, position, angles, details, frames, seed)
+
+
+# Tính lượt quay tiếp theo từ state và gửi từng khung hình cho executor
+# Không truyền rng thì dùng một seed mới (giữ ở spin.seed để ghi nhật ký)
+def prerender_spin(executor, render, state, rng=None, lod_levels=LOD_LEVELS, **trajectory_options):
+    rng = new_seed() if rng is None else rng
+    positions = list(state.available_positions)
+    start_angle = state.wheel_angle
+    position, angles = plan_spin(state, rng, wrap=False, **trajectory_options)
+    return prerender_trajectory(executor, render, positions, start_angle, position, angles, lod_levels, rng)
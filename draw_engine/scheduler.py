@@ -0,0 +1,49 @@
+# Lập lịch khung hình theo thời gian thực / Wall-clock frame scheduler
+# Khung hình i được dành khe thời gian [i, i + 1) * duration / n_frames tính từ lúc bắt đầu.
+# Thời gian vẽ và gửi từng khung hình được trừ vào khe đó thay vì ngủ cố định; khung hình
+# đã trễ quá khe của mình thì bị bỏ qua, trừ keep_tail khung hình cuối (dừng và nảy) luôn
+# được hiển thị. Nhờ vậy lượt quay dài bằng nhau trên máy yếu và máy mạnh.
+import time
+
+
+class FrameScheduler:
+    def __init__(self, n_frames, duration, keep_tail=1, clock=time.perf_counter, sleep=time.sleep):
+        self.n_frames = n_frames
+        self.duration = duration
+        self.keep_tail = keep_tail
+        self.clock = clock
+        self.sleep = sleep
+        self.shown = 0
+        self.dropped = 0
+        self.elapsed = 0.0
+    
+    # Duyệt chỉ số các khung hình cần hiển thị
+    def __iter__(self):
+        interval = self.duration / self.n_frames
+        start = self.clock()
+        
+        for i in range(self.n_frames):
+            if i < self.n_frames - self.keep_tail and self.clock() - start > (i + 1) * interval:
+                self.dropped += 1
+                continue
+            
+            yield i
+            self.shown += 1
+            
+            # Chờ tới khe của khung hình kế tiếp
+            wait = (i + 1) * interval - (self.clock() - start)
+            if wait > 0:
+                self.sleep(wait)
+        
+        self.elapsed = self.clock() - start
+    
+    # Số liệu của lượt phát: số khung hình hiển thị / bỏ qua, fps đạt được so với mục tiêu
+    def stats(self):
+        return {
+            'frames': self.n_frames,
+            'shown': self.shown,
+            'dropped': self.dropped,
+            'duration': self.elapsed,
+            'fps': self.shown / self.elapsed if self.elapsed else 0.0,
+            'target_fps': self.n_frames / self.duration,
+        }
@@ -0,0 +1,128 @@
+# Mô phỏng Monte Carlo độ công bằng của vòng quay / Monte Carlo fairness simulation
+# Chạy đúng logic bốc thăm (chọn phần tử đích, quỹ đạo dừng, xác định phần tử dưới mũi tên)
+# cho hàng triệu lượt quay mà không vẽ, rồi kiểm định chi bình phương cho từng cỡ vòng quay.
+#
+#   python -m draw_engine.simulate --draws 1000000 --workers 4
+import argparse
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .geometry import sector_indices
+from .trajectory import landing_angles
+
+CHUNK_SIZE = 1_000_000  # Số lượt quay tối đa mỗi tác vụ, giới hạn bộ nhớ của từng tiến trình
+
+
+# Hàm gamma không đầy đủ chính quy phía trên Q(a, x) (chuỗi / liên phân số)
+def _gamma_q(a, x):
+    if x <= 0:
+        return 1.0
+    log_prefix = a * math.log(x) - x - math.lgamma(a)
+    if x < a + 1:
+        term = total = 1 / a
+        for k in range(1, 1000):
+            term *= x / (a + k)
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return max(0.0, 1 - total * math.exp(log_prefix))
+    
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return math.exp(log_prefix) * h
+
+
+# Giá trị p của phân phối chi bình phương (không cần scipy)
+def chi2_sf(statistic, df):
+    if df <= 0:
+        return 1.0
+    return _gamma_q(df / 2, statistic / 2)
+
+
+# Mô phỏng một khối lượt quay cho vòng quay n phần tử, trả về số lần dừng ở mỗi phần tử
+# và số lượt mà phần tử xác định được khác phần tử đích
+def _simulate_chunk(n_sectors, draws, seed):
+    rng = np.random.default_rng(seed)
+    starts = rng.uniform(0, 360, draws)
+    targets = rng.integers(n_sectors, size=draws)
+    finals = landing_angles(starts, targets, n_sectors, rng)
+    landed = sector_indices(finals, n_sectors)
+    return np.bincount(landed, minlength=n_sectors), int(np.count_nonzero(landed != targets))
+
+
+# Mô phỏng draws lượt quay cho mỗi cỡ vòng quay trong sizes, chia khối cho nhóm tiến trình
+def simulate(sizes=range(8, 0, -1), draws=1_000_000, workers=None, seed=None):
+    sizes = list(sizes)
+    seeds = iter(np.random.SeedSequence(seed).spawn(len(sizes) * math.ceil(draws / CHUNK_SIZE)))
+    
+    jobs = []
+    for n in sizes:
+        for start in range(0, draws, CHUNK_SIZE):
+            jobs.append((n, min(CHUNK_SIZE, draws - start), next(seeds)))
+    
+    counts = {n: np.zeros(n, dtype=np.int64) for n in sizes}
+    mismatches = dict.fromkeys(sizes, 0)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [(n, pool.submit(_simulate_chunk, n, size, job_seed)) for n, size, job_seed in jobs]
+        for n, future in futures:
+            chunk_counts, chunk_mismatches = future.result()
+            counts[n] += chunk_counts
+            mismatches[n] += chunk_mismatches
+    
+    report = []
+    for n in sizes:
+        expected = draws / n
+        statistic = float(((counts[n] - expected) ** 2 / expected).sum())
+        report.append({
+            'sectors': n,
+            'draws': draws,
+            'frequencies': (counts[n] / draws).tolist(),
+            'chi2': statistic,
+            'df': n - 1,
+            'p_value': chi2_sf(statistic, n - 1),
+            'mismatches': mismatches[n],
+        })
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kiểm tra độ công bằng của vòng quay / Wheel fairness check")
+    parser.add_argument('--draws', type=int, default=1_000_000, help="số lượt quay cho mỗi cỡ vòng quay")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(range(8, 0, -1)), help="các cỡ vòng quay cần kiểm tra")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="số tiến trình")
+    parser.add_argument('--seed', type=int, default=None, help="hạt giống ngẫu nhiên để tái lập kết quả")
+    args = parser.parse_args(argv)
+    
+    started = time.perf_counter()
+    report = simulate(args.sizes, args.draws, args.workers, args.seed)
+    elapsed = time.perf_counter() - started
+    
+    for row in report:
+        frequencies = ' '.join(f"{f:.4f}" for f in row['frequencies'])
+        print(f"n={row['sectors']}  chi2={row['chi2']:.2f}  df={row['df']}  p={row['p_value']:.4f}  "
+              f"sai lệch={row['mismatches']}  tần suất: {frequencies}")
+    total = args.draws * len(args.sizes)
+    print(f"{total:,} lượt quay trong {elapsed:.2f}s ({total / elapsed:,.0f} lượt/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+# Trạng thái bốc thăm / Draw state model
+# Các hàm ở đây nhận bất kỳ đối tượng nào truy cập thuộc tính được: st.session_state
+# trên trang Streamlit, hoặc DrawState khi chạy không giao diện (CLI, kiểm thử, mô phỏng).
+import json
+import math
+import secrets
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .geometry import selected_position
+from .trajectory import spin_trajectory
+
+# Danh sách 8 đội thi đấu
+ALL_TEAMS = [
+    "HR - PLANNING", "WW P2", "GA", "FINISHING P1",
+    "UPH", "WW P1", "INLAY", "FINISHING P2"
+]
+
+GROUPS = ['A', 'B']
+SLOTS_PER_GROUP = 4
+
+
+# Tên của count bảng: A..Z, rồi AA, AB... như cột bảng tính
+def group_names(count):
+    names = []
+    for i in range(count):
+        name = ''
+        i += 1
+        while i:
+            i, rest = divmod(i - 1, 26)
+            name = chr(ord('A') + rest) + name
+        names.append(name)
+    return names
+
+
+# Tên bảng của một vị trí (bỏ phần số cuối: "A3" -> "A", "AB12" -> "AB")
+def position_group(position):
+    return position.rstrip('0123456789')
+
+
+# Tạo tất cả các vị trí có thể (A1..A4, B1..B4)
+def make_positions(groups=GROUPS, slots_per_group=SLOTS_PER_GROUP):
+    positions = []
+    for group in groups:
+        for i in range(1, slots_per_group + 1):
+            positions.append(f"{group}{i}")
+    return positions
+
+
+# Bảng kết quả trống: mỗi bảng một danh sách vị trí
+def make_result_table(groups=GROUPS, slots_per_group=SLOTS_PER_GROUP):
+    return {group: [None] * slots_per_group for group in groups}
+
+
+# Luật của giải mặc định (nhập khi gọi vì constraints dùng lại state)
+def default_rules():
+    from .constraints import DEPARTMENT_RULES
+    return DEPARTMENT_RULES
+
+
+# Cấu hình giải: danh sách đội, tên các bảng, số vị trí mỗi bảng, tiêu đề trang và luật bốc thăm
+@dataclass
+class Tournament:
+    teams: list = field(default_factory=lambda: list(ALL_TEAMS))
+    groups: list = field(default_factory=lambda: list(GROUPS))
+    slots_per_group: int = SLOTS_PER_GROUP
+    title: dict = None  # Tiêu đề trang theo ngôn ngữ ({"vi": ..., "en": ...}); None: tiêu đề mặc định
+    rules: object = field(default_factory=default_rules)  # DrawRules: cặp đội cấm chung bảng, pot, hạt giống
+    
+    def __post_init__(self):
+        # Vị trí là tên bảng + số thứ tự và position_group bỏ phần số cuối để lấy lại tên bảng,
+        # nên tên bảng không được rỗng, trùng nhau hay kết thúc bằng chữ số ("G1" sẽ thành "G")
+        for group in self.groups:
+            if not isinstance(group, str) or not group or group[-1].isdigit():
+                raise ValueError(f"tên bảng không hợp lệ: {group!r} (không được rỗng hay kết thúc bằng chữ số)")
+        if len(set(self.groups)) != len(self.groups):
+            raise ValueError(f"tên bảng bị trùng: {self.groups}")
+        if len(self.teams) > len(self.groups) * self.slots_per_group:
+            raise ValueError(f"{len(self.teams)} đội không đủ chỗ trong {len(self.groups)} bảng x {self.slots_per_group} vị trí")
+        # Luật không thể thỏa mãn thì báo ngay khi nạp giải, không phải khi bấm Bốc thăm
+        if self.rules and not self.rules.feasible(DrawState(positions=self.positions(), result_table=self.result_table()),
+                                                  self.teams):
+            raise ValueError("luật bốc thăm (cặp đội cấm chung bảng, pot, hạt giống) không thể thỏa mãn với các đội và bảng này")
+    
+    def positions(self):
+        return make_positions(self.groups, self.slots_per_group)
+    
+    def result_table(self):
+        return make_result_table(self.groups, self.slots_per_group)
+
+
+# Cấu hình giải: {"teams": [...], "groups": 4 hoặc ["A", ...], "slots_per_group": 4, "title": {"vi": ..., "en": ...},
+#                "forbidden": [[đội, đội], ...], "pots": [[đội, ...], ...], "seeds": [đội, ...]}
+# Thiếu "groups" thì chia đủ số bảng cho số đội; luật xem constraints.rules_from_config
+def tournament_from_config(config):
+    from .constraints import rules_from_config
+    
+    teams = config.get('teams', ALL_TEAMS)
+    slots_per_group = config.get('slots_per_group', SLOTS_PER_GROUP)
+    groups = config.get('groups', math.ceil(len(teams) / slots_per_group))
+    if isinstance(groups, int):
+        groups = group_names(groups)
+    return Tournament(list(teams), list(groups), slots_per_group, config.get('title'), rules_from_config(config))
+
+
+# Đọc cấu hình một giải từ tệp JSON
+def load_tournament(path):
+    with open(path, encoding='utf-8') as f:
+        return tournament_from_config(json.load(f))
+
+
+# Đọc danh sách giải từ tệp JSON {"<mã giải>": <cấu hình giải>, ...}, giữ thứ tự trong tệp
+# (giải đầu tiên là mặc định). Mã giải dùng trong URL (?tournament=<mã>) và tên tệp nhật ký.
+def load_tournaments(path):
+    with open(path, encoding='utf-8') as f:
+        registry = json.load(f)
+    if not registry:
+        raise ValueError(f"{path}: chưa có giải nào")
+    for tournament_id in registry:
+        if not tournament_id.replace('-', '').replace('_', '').isalnum():
+            raise ValueError(f"mã giải không hợp lệ: {tournament_id!r} (chỉ chữ, số, '-' và '_')")
+    return {tournament_id: tournament_from_config(config) for tournament_id, config in registry.items()}
+
+
+@dataclass
+class DrawState:
+    positions: list = field(default_factory=make_positions)
+    available_positions: list = None
+    results: dict = field(default_factory=dict)
+    used_teams: list = field(default_factory=list)
+    result_table: dict = field(default_factory=make_result_table)
+    wheel_angle: float = 0
+    
+    def __post_init__(self):
+        if self.available_positions is None:
+            self.available_positions = self.positions.copy()
+
+
+# Khởi tạo các khóa còn thiếu trong state (giữ nguyên khóa đã có) theo cấu hình giải
+def init_state(state, tournament=None):
+    if tournament is None:
+        defaults = DrawState()
+    else:
+        defaults = DrawState(positions=tournament.positions(), result_table=tournament.result_table())
+    for name in ('positions', 'available_positions', 'results', 'used_teams', 'result_table', 'wheel_angle'):
+        if not hasattr(state, name):
+            setattr(state, name, getattr(defaults, name))
+
+
+# Lọc các đội chưa được bốc thăm
+def available_teams(state, teams=ALL_TEAMS):
+    return [team for team in teams if team not in state.used_teams]
+
+
+# Hàm cập nhật bảng kết quả
+def update_result_table(state, position, team):
+    group = position_group(position)  # Lấy phần chữ (A, B, ..., AA)
+    index = int(position[len(group):]) - 1  # Lấy số (0-based index)
+    state.result_table[group][index] = team
+
+
+# Các chỉ số phần tử vòng quay mà team được phép trúng (tất cả nếu không có ràng buộc)
+def allowed_indices(state, team=None, rules=None, teams=ALL_TEAMS):
+    if not rules or team is None:
+        return list(range(len(state.available_positions)))
+    allowed = set(rules.allowed_positions(state, team, teams))
+    if not allowed:
+        raise ValueError(f"Không còn vị trí hợp lệ cho đội {team}")
+    return [i for i, position in enumerate(state.available_positions) if position in allowed]
+
+
+# Hạt giống ngẫu nhiên cho một lượt quay, ghi vào nhật ký để tính lại đúng quỹ đạo khi phát lại
+def new_seed():
+    return secrets.randbits(63)
+
+
+# Lên kế hoạch một lượt quay: chọn ngẫu nhiên phần tử đích và tính quỹ đạo.
+# Có rules (DrawRules) thì phần tử đích chỉ chọn trong các vị trí giữ cho lượt bốc thăm xếp được.
+# Trả về vị trí trúng thăm và mảng góc của các khung hình (chưa ghi nhận kết quả).
+def plan_spin(state, rng=None, team=None, rules=None, teams=ALL_TEAMS, **trajectory_options):
+    rng = np.random.default_rng(rng)
+    n = len(state.available_positions)
+    indices = allowed_indices(state, team, rules, teams)
+    target = indices[int(rng.integers(len(indices)))]
+    angles = spin_trajectory(state.wheel_angle, target, n, rng=rng, **trajectory_options)
+    return selected_position(state.available_positions, angles[-1]), angles
+
+
+# Ghi nhận kết quả bốc thăm của một đội
+# Vị trí đã có đội thì báo lỗi trước khi sửa state, để state không bị ghi dở
+def commit_draw(state, team, position, final_angle):
+    if position not in state.available_positions:
+        raise ValueError(f"Vị trí {position} đã có đội, không thể xếp đội {team}")
+    
+    # Lưu góc quay cuối cùng
+    state.wheel_angle = float(final_angle) % 360
+    
+    # Lưu kết quả
+    if team not in state.used_teams:
+        state.used_teams.append(team)
+    state.results[team] = position
+    state.available_positions.remove(position)
+    
+    # Cập nhật bảng kết quả
+    update_result_table(state, position, team)
+
+
+# Bốc thăm tất cả các đội còn lại trong một thao tác: từng đội vẫn qua đúng một lượt quay như
+# trên trang, nhưng được tính trên bản sao rồi mới ghi vào state một lần (hoặc không ghi gì nếu lỗi).
+# Trả về danh sách lượt quay (đội, vị trí, vòng quay lúc đó, góc bắt đầu, quỹ đạo, seed) để phát hoạt ảnh.
+# Mỗi lượt quay có seed riêng (rút từ rng) để ghi nhật ký và phát lại từng lượt.
+def draw_remaining(state, teams=ALL_TEAMS, rng=None, rules=None, **trajectory_options):
+    rng = np.random.default_rng(rng)
+    scratch = DrawState(
+        positions=list(state.positions),
+        available_positions=list(state.available_positions),
+        results=dict(state.results),
+        used_teams=list(state.used_teams),
+        result_table={group: list(slots) for group, slots in state.result_table.items()},
+        wheel_angle=state.wheel_angle,
+    )
+    
+    spins = []
+    for team in available_teams(scratch, teams):
+        if not scratch.available_positions:
+            break
+        positions = list(scratch.available_positions)
+        start_angle = scratch.wheel_angle
+        seed = int(rng.integers(2 ** 63))
+        position, angles = plan_spin(scratch, seed, team, rules, teams, **trajectory_options)
+        commit_draw(scratch, team, position, angles[-1])
+        spins.append({
+            'team': team,
+            'position': position,
+            'positions': positions,
+            'start_angle': start_angle,
+            'angles': angles,
+            'seed': seed,
+        })
+    
+    for key in ('available_positions', 'results', 'used_teams', 'result_table', 'wheel_angle'):
+        setattr(state, key, getattr(scratch, key))
+    return spins
+
+
+# Bốc thăm toàn bộ các đội còn lại, không có hoạt ảnh
+def run_draw(state=None, teams=ALL_TEAMS, rng=None, rules=None):
+    state = DrawState() if state is None else state
+    draw_remaining(state, teams, rng, rules)
+    return state
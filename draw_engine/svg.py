@@ -0,0 +1,84 @@
+# Vẽ vòng quay bằng SVG / Pure-SVG wheel renderer
+# Cùng hình học và bảng màu với draw_engine.wheel nhưng xuất thẳng chuỗi SVG (vài KB) thay vì
+# dựng Figure matplotlib rồi mã hóa PNG. Các phần tử được dựng một lần cho mỗi tập vị trí, mỗi
+# khung hình chỉ đổi một thuộc tính transform="rotate(...)" và vị trí các nhãn (chữ luôn nằm ngang).
+# Không cần matplotlib hay Pillow.
+import functools
+import math
+from html import escape
+
+from .wheel import WHEEL_COLORS, WHEEL_TEXT_RADIUS, label_size, wheel_labels
+
+# Đổi point sang đơn vị dữ liệu ([-1, 1]) theo Figure 10 inch, dpi 100 của draw_engine.wheel
+# (trục tọa độ rộng ~770 px), giống component trình duyệt
+POINT = 100 / 72 * 2 / 770
+
+
+def _num(value):
+    return f"{value:.4f}".rstrip('0').rstrip('.')
+
+
+# Chữ trắng viền đen: nét viền vẽ dưới phần tô (paint-order) nên chỉ cần một thẻ <text>
+def _outlined_text(x, y, text, size, outline):
+    return (f'<text x="{_num(x)}" y="{_num(-y)}" font-size="{_num(size * POINT)}" '
+            f'stroke-width="{_num(outline * POINT)}">{escape(text)}</text>')
+
+
+# Lớp quay (các phần tử) ở góc 0, dựng một lần cho mỗi tập vị trí
+@functools.lru_cache(maxsize=64)
+def sector_paths(positions):
+    n = len(positions)
+    step = 2 * math.pi / n
+    paths = []
+    for i in range(n):
+        a1, a2 = i * step, (i + 1) * step
+        x1, y1 = 0.92 * math.cos(a1), -0.92 * math.sin(a1)
+        x2, y2 = 0.92 * math.cos(a2), -0.92 * math.sin(a2)
+        large = 1 if step > math.pi else 0
+        if n == 1:
+            paths.append(f'<circle r="0.92" fill="{WHEEL_COLORS[0]}"/>')
+        else:
+            paths.append(f'<path d="M0 0L{_num(x1)} {_num(y1)}A0.92 0.92 0 {large} 0 {_num(x2)} {_num(y2)}Z" '
+                         f'fill="{WHEEL_COLORS[i % len(WHEEL_COLORS)]}"/>')
+    return ''.join(paths)
+
+
+# Phần đầu (nền, viền ngoài) và phần cuối (vòng tròn giữa, chữ "RSC", mũi tên) không đổi
+SVG_HEAD = (
+    '<svg xmlns="http://www.w3.org/2000/svg" viewBox="-1 -1 2 2" width="100%" '
+    'font-family="DejaVu Sans, Verdana, sans-serif" font-weight="bold">'
+    '<circle cx="0.02" cy="0.02" r="0.95" fill="#000" fill-opacity="0.133"/>'
+    f'<circle r="0.95" fill="none" stroke="#333333" stroke-width="{_num(2 * POINT)}"/>'
+    f'<circle r="0.97" fill="none" stroke="#FFFFFF" stroke-opacity="0.333" stroke-width="{_num(3 * POINT)}"/>'
+)
+SVG_TAIL = (
+    f'<circle r="0.27" fill="#333333" stroke="#555555" stroke-width="{_num(4 * POINT)}"/>'
+    f'<circle r="0.25" fill="#444444" stroke="#666666" stroke-width="{_num(2 * POINT)}"/>'
+    '<g fill="white" stroke="black" stroke-linejoin="round" paint-order="stroke" '
+    'text-anchor="middle" dominant-baseline="central">'
+    + _outlined_text(0, 0, "RSC", 30, 5.6) +
+    '</g>'
+    f'<path d="M0 -0.92L-0.04 -0.995L0 -0.845L0.04 -0.995Z" fill="red" stroke="darkred" stroke-width="{_num(POINT)}"/>'
+    '</svg>'
+)
+
+
+# Chuỗi SVG của vòng quay ở góc angle (độ, ngược chiều kim đồng hồ như matplotlib)
+def wheel_svg(positions, angle=0, labels=True):
+    positions = tuple(positions)
+    parts = [
+        SVG_HEAD,
+        f'<g transform="rotate({_num(-angle % 360)})" stroke="white" stroke-width="{_num(POINT)}">',
+        sector_paths(positions),
+        '</g>',
+    ]
+    if labels:
+        size = label_size(len(positions))
+        parts.append('<g fill="white" stroke="black" stroke-linejoin="round" paint-order="stroke" '
+                     'text-anchor="middle" dominant-baseline="central">')
+        for mid_angle, position in wheel_labels(positions, angle):
+            parts.append(_outlined_text(WHEEL_TEXT_RADIUS * math.cos(mid_angle), WHEEL_TEXT_RADIUS * math.sin(mid_angle),
+                                        position, size, 2.8 * size / 14))
+        parts.append('</g>')
+    parts.append(SVG_TAIL)
+    return ''.join(parts)
@@ -0,0 +1,75 @@
+# Quỹ đạo quay của vòng quay / Spin trajectory
+# Toàn bộ chuỗi góc của một lượt quay được tính bằng một lần đánh giá NumPy,
+# khung hình cuối luôn nằm trong phần tử đích.
+import numpy as np
+
+from .geometry import sector_angle
+
+
+# Hàm easing easeInOutCirc dạng vector
+def ease_in_out_circ(t):
+    t = np.asarray(t, dtype=float)
+    return np.where(
+        t < 0.5,
+        0.5 * (1 - np.sqrt(np.clip(1 - 4 * t * t, 0, None))),
+        0.5 * (np.sqrt(np.clip(-((2 * t - 3) * (2 * t - 1)), 0, None)) + 1),
+    )
+
+
+# Giảm tốc theo hàm mũ, chuẩn hóa để kết thúc đúng tại 1
+def ease_out_expo(t, rate=6.0):
+    return (1 - np.exp(-rate * np.asarray(t, dtype=float))) / (1 - np.exp(-rate))
+
+
+# Các mô hình giảm tốc / Easing and deceleration models, t trong [0, 1]
+EASINGS = {
+    'ease_out_cubic': lambda t: 1 - (1 - np.asarray(t, dtype=float)) ** 3,
+    'ease_out_quart': lambda t: 1 - (1 - np.asarray(t, dtype=float)) ** 4,
+    'ease_out_expo': ease_out_expo,
+    'ease_in_out_circ': ease_in_out_circ,
+}
+
+
+# Góc dừng (chưa chia dư 360) cho một hoặc nhiều lượt quay cùng lúc
+# Vòng quay luôn quay tiến thêm số vòng ngẫu nhiên trong turns rồi dừng trong phần tử đích,
+# cách hai mép phần tử ít nhất margin (tỉ lệ độ rộng phần tử).
+def landing_angles(start_angles, target_indices, n_sectors, rng=None, turns=(15, 25), margin=0.2):
+    rng = np.random.default_rng(rng)
+    start_angles = np.asarray(start_angles, dtype=float)
+    target_indices = np.asarray(target_indices)
+    shape = np.broadcast(start_angles, target_indices).shape
+    
+    offsets = rng.uniform(margin, 1 - margin, shape)
+    extra_turns = rng.integers(turns[0], turns[1], size=shape, endpoint=True)
+    delta = (sector_angle(target_indices, n_sectors, offsets) - start_angles) % 360
+    return start_angles + extra_turns * 360 + delta
+
+
+# Chuỗi góc cho một lượt quay: n_frames khung hình chuyển động theo easing,
+# nhiễu nhỏ ở 90% quãng đầu và đuôi nảy bounce khung hình trước khi dừng hẳn.
+# wrap=False trả về góc liên tục (chưa chia dư) để nội suy hoạt ảnh.
+def spin_trajectory(start_angle, target_index, n_sectors, n_frames=10, easing='ease_out_cubic',
+                    rng=None, turns=(15, 25), margin=0.2, jitter=0.5, bounce=3, wrap=True):
+    rng = np.random.default_rng(rng)
+    ease = EASINGS[easing] if isinstance(easing, str) else easing
+    end_angle = float(landing_angles(start_angle, target_index, n_sectors, rng, turns, margin))
+    
+    t = np.arange(1, n_frames + 1) / n_frames
+    angles = start_angle + (end_angle - start_angle) * ease(t)
+    
+    # Thêm nhiễu ngẫu nhiên (không ảnh hưởng khung hình cuối)
+    angles += rng.uniform(-jitter, jitter, n_frames) * (t < 0.9)
+    angles[-1] = end_angle
+    
+    # Thêm hiệu ứng nảy khi dừng: lệch xen kẽ -0.3°, +0.6°, -0.9°... rồi về đúng góc dừng
+    if bounce:
+        steps = np.arange(1, bounce + 1)
+        tail = np.where(steps % 2 == 0, 1, -1) * steps * 0.3
+        angles = np.concatenate([angles, end_angle + tail, [end_angle]])
+    
+    return angles % 360 if wrap else angles
+
+
+# Số khung hình đuôi nảy được nối sau n_frames khung hình chuyển động (các khung lệch và khung về đúng góc)
+def bounce_frame_count(bounce=3):
+    return bounce + 1 if bounce else 0
@@ -0,0 +1,45 @@
+# Làm nóng tiến trình / Process warm-up
+# Dựng trước những gì lần chạy đầu tiên phải trả: tra font đậm và dàn đường nét chữ của nhãn, âm thanh
+# và font nhúng, ảnh vòng quay tĩnh. Kết quả nằm trong cache của tiến trình (lru_cache, FrameCache...)
+# nên phiên đầu tiên cũng nhanh như các phiên sau.
+import time
+
+from .assets import audio_uri, font_face_css
+
+
+# Đường nét chữ của các nhãn ở mọi cỡ chữ mà vòng quay dùng khi còn n = len(positions)..1 phần tử,
+# kèm chữ "RSC" ở giữa; lần gọi đầu cũng là lúc matplotlib tìm font đậm.
+# Chỉ dựng tới khi đầy cache của glyph_path (vòng quay lớn có nhiều cỡ chữ): ưu tiên các cỡ dùng trước
+def warm_glyphs(positions):
+    from .wheel import glyph_path, label_size
+    
+    glyph_path("RSC", 30)
+    budget = glyph_path.cache_info().maxsize - 1
+    sizes = list(dict.fromkeys(label_size(n) for n in range(len(positions), 0, -1)))
+    for size in sizes[:max(1, budget // max(len(positions), 1))]:
+        for position in positions:
+            glyph_path(position, size)
+
+
+# Các bước dùng chung cho mọi chế độ vẽ; position_sets: các vị trí của từng giải mà máy chủ phục vụ
+# glyphs=False khi không vẽ bằng matplotlib (không nạp thư viện)
+def engine_steps(position_sets, glyphs=True):
+    steps = [
+        ('audio', lambda: [audio_uri(name) for name in ('spin', 'result')]),
+        ('font_css', font_face_css),
+    ]
+    if glyphs:
+        steps.append(('glyphs', lambda: [warm_glyphs(positions) for positions in position_sets]))
+    return steps
+
+
+# Chạy lần lượt các bước (tên, hàm không tham số), trả về thời gian từng bước và tổng (ms)
+def warm_up(steps):
+    timings = {}
+    started = time.perf_counter()
+    for name, step in steps:
+        start = time.perf_counter()
+        step()
+        timings[name] = (time.perf_counter() - start) * 1000
+    timings['total'] = (time.perf_counter() - started) * 1000
+    return timings
@@ -0,0 +1,470 @@
+# Vẽ vòng quay / Wheel rendering
+# matplotlib và Pillow chỉ được nạp khi thực sự vẽ, nên bộ máy bốc thăm vẫn import được
+# ở môi trường không có thư viện vẽ. Các lớp raster được lưu cache theo tiến trình.
+import functools
+import io
+import math
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+
+# Lớp nền tĩnh: đổ bóng và viền ngoài (nằm dưới các phần tử)
+def draw_wheel_background(ax):
+    from matplotlib.patches import Circle
+    
+    # Vẽ hình nền (đổ bóng)
+    shadow_circle = Circle((0.02, -0.02), 0.95, fc='#00000022', zorder=0)
+    ax.add_patch(shadow_circle)
+    
+    # Vẽ viền ngoài vòng quay
+    outer_circle = Circle((0, 0), 0.95, fc='none', ec='#333333', lw=2, zorder=1)
+    ax.add_patch(outer_circle)
+    
+    # Thêm viền ngoài để thêm hiệu ứng đổ bóng
+    highlight_circle = Circle((0, 0), 0.97, fc='none', ec='#FFFFFF55', lw=3, zorder=1)
+    ax.add_patch(highlight_circle)
+
+
+WHEEL_LABEL_SIZE = 14   # Cỡ chữ nhãn (point) khi vòng quay còn thưa
+WHEEL_MIN_LABEL_SIZE = 9
+WHEEL_MAX_LABELS = 32   # Vòng quay dày hơn thì chỉ ghi nhãn cách quãng để chữ không chồng lên nhau
+
+
+# Cỡ chữ nhãn: giữ nguyên tới 16 phần tử rồi nhỏ dần theo độ rộng cung
+def label_size(n):
+    return max(WHEEL_MIN_LABEL_SIZE, min(WHEEL_LABEL_SIZE, WHEEL_LABEL_SIZE * 16 / max(n, 1)))
+
+
+# Cứ bao nhiêu phần tử thì ghi một nhãn
+def label_stride(n):
+    return max(1, math.ceil(n / WHEEL_MAX_LABELS))
+
+
+# Tính góc giữa (radian) của nhãn từng phần tử tại góc quay cho trước (chỉ các nhãn được ghi)
+def wheel_labels(positions, angle=0):
+    n = len(positions)
+    theta2 = 360 / n
+    return [(np.radians(angle + i * theta2 + theta2 / 2), positions[i]) for i in range(0, n, label_stride(n))]
+
+
+# Bảng màu các phần tử, dùng chung cho matplotlib và component trình duyệt
+WHEEL_COLORS = ['#FF5252', '#FF7752', '#FFCA52', '#FFE552', '#B4FF52', '#52FF8F', '#52FFDF', '#52BFFF', '#5275FF', '#8A52FF', '#D452FF', '#FF52C9']
+
+
+# Lớp quay: các phần tử (wedge), trả về danh sách wedge theo thứ tự vị trí
+def draw_wheel_sectors(ax, positions, angle=0):
+    from matplotlib.patches import Wedge
+    
+    # Số lượng phần tử trên vòng quay
+    n = len(positions)
+    
+    # Tạo gradient màu hơi sáng để hiển thị đẹp
+    colors = []
+    base_colors = WHEEL_COLORS
+    
+    for i in range(n):
+        color_idx = i % len(base_colors)
+        colors.append(base_colors[color_idx])
+    
+    # Vẽ các phần tử trên vòng quay
+    theta1 = angle  # Bắt đầu từ góc quay hiện tại
+    theta2 = 360 / n
+    wedges = []
+    
+    for i in range(n):
+        # Thêm hiệu ứng 3D với độ sáng khác nhau cho các phần
+        base_color = colors[i]
+        
+        # Tạo wedge chính
+        wedge = Wedge((0, 0), 0.92, theta1, theta1 + theta2, fc=base_color, ec='white', lw=1, zorder=2)
+        ax.add_patch(wedge)
+        wedges.append(wedge)
+        
+        theta1 += theta2
+    
+    return wedges
+
+
+# Đường nét chữ đậm của một chuỗi (đơn vị point, tâm tại gốc tọa độ), dựng một lần cho mỗi
+# (chuỗi, cỡ chữ) nên các khung hình sau không phải dàn trang font nữa
+@functools.lru_cache(maxsize=256)
+def glyph_path(text, size):
+    from matplotlib.font_manager import FontProperties
+    from matplotlib.textpath import TextPath
+    from matplotlib.transforms import Affine2D
+    
+    path = TextPath((0, 0), text, size=size, prop=FontProperties(weight='bold'))
+    (x0, y0), (x1, y1) = path.get_extents().get_points()
+    return path.transformed(Affine2D().translate(-(x0 + x1) / 2, -(y0 + y1) / 2))
+
+
+# point -> inch -> pixel, rồi dời tới vị trí (x, y) của trục
+def text_transform(ax, x, y):
+    from matplotlib.transforms import Affine2D, ScaledTranslation
+    
+    return Affine2D().scale(1 / 72) + ax.figure.dpi_scale_trans + ScaledTranslation(x, y, ax.transData)
+
+
+# Chữ trắng viền đen tại (x, y) trên trục, thay cho 9 lần vẽ text (8 bản đen lệch nhau + 1 bản trắng):
+# cùng một đường nét chữ được vẽ hai lần, lần dưới là nét viền đen dày outline (point), lần trên là phần tô trắng
+def outlined_text(ax, x, y, text, size, outline=2.8, zorder=3):
+    from matplotlib.patches import PathPatch
+    
+    transform = text_transform(ax, x, y)
+    path = glyph_path(text, size)
+    stroke = PathPatch(path, fc='black', ec='black', lw=outline, joinstyle='round', transform=transform, zorder=zorder)
+    fill = PathPatch(path, fc='white', lw=0, transform=transform, zorder=zorder)
+    ax.add_patch(stroke)
+    ax.add_patch(fill)
+    return [stroke, fill]
+
+
+# Nhãn của các phần tử (chữ luôn nằm ngang), trả về danh sách artist của từng nhãn
+WHEEL_TEXT_RADIUS = 0.6  # Đặt nhãn gần tâm hơn một chút để dễ đọc
+
+
+def draw_wheel_labels(ax, positions, angle=0):
+    label_artists = []
+    size = label_size(len(positions))
+    
+    for mid_angle, position in wheel_labels(positions, angle):
+        text_x = WHEEL_TEXT_RADIUS * np.cos(mid_angle)
+        text_y = WHEEL_TEXT_RADIUS * np.sin(mid_angle)
+        label_artists.append(outlined_text(ax, text_x, text_y, position, size, outline=2.8 * size / WHEEL_LABEL_SIZE))
+    
+    return label_artists
+
+
+# Lớp trên cùng tĩnh: vòng tròn giữa, chữ "RSC" và mũi tên
+def draw_wheel_foreground(ax):
+    from matplotlib.patches import Circle, Polygon
+    
+    # Thêm vòng tròn ở giữa
+    inner_circle_bg = Circle((0, 0), 0.27, fc='#333333', ec='#555555', lw=4, zorder=5)
+    ax.add_patch(inner_circle_bg)
+    
+    center_circle = Circle((0, 0), 0.25, fc='#444444', ec='#666666', lw=2, zorder=6)
+    ax.add_patch(center_circle)
+    
+    # Logo hoặc văn bản ở giữa, viền đen dày hơn nhãn
+    outlined_text(ax, 0, 0, "RSC", 30, outline=5.6, zorder=7)
+    
+    # Thêm mũi tên chỉ vị trí (ở trên cùng với hiệu ứng đẹp hơn)
+    arrow_height = 0.15
+    arrow_width = 0.08
+    arrow_x = 0
+    arrow_y = 0.92
+    
+    # Tạo hình mũi tên
+    arrow_shape = np.array([[arrow_x, arrow_y], 
+                           [arrow_x - arrow_width/2, arrow_y + arrow_height/2], 
+                           [arrow_x, arrow_y - arrow_height/2],
+                           [arrow_x + arrow_width/2, arrow_y + arrow_height/2]])
+    
+    arrow = Polygon(arrow_shape, fc='red', ec='darkred', lw=1, zorder=10)
+    ax.add_patch(arrow)
+
+
+# Tạo Figure và trục tọa độ chung cho vòng quay
+def new_wheel_axes():
+    from matplotlib.figure import Figure
+    
+    fig = Figure(figsize=(10, 10), dpi=100)
+    ax = fig.add_subplot(111)
+    
+    ax.set_xlim(-1, 1)
+    ax.set_ylim(-1, 1)
+    ax.set_aspect('equal')
+    ax.axis('off')
+    
+    # Đặt màu nền trong suốt
+    fig.patch.set_alpha(0.0)
+    
+    return fig, ax
+
+
+# Hàm vẽ vòng quay may mắn với góc quay và hiệu ứng 3D - không sử dụng patheffects
+# labels=False bỏ nhãn (khung hình quay nhanh, xem draw_engine.lod)
+def create_wheel(positions, angle=0, labels=True):
+    fig, ax = new_wheel_axes()
+    
+    draw_wheel_background(ax)
+    draw_wheel_sectors(ax, positions, angle)
+    if labels:
+        draw_wheel_labels(ax, positions, angle)
+    draw_wheel_foreground(ax)
+    
+    return fig, wheel_labels(positions, angle)
+
+
+# Giải phóng Figure ngay sau khi mã hóa: xóa các artist và bỏ liên kết vòng Figure <-> canvas,
+# bộ nhớ được trả lại ngay thay vì chờ bộ gom rác chạy
+def release_figure(fig):
+    fig.clear()
+    fig.canvas.figure = None
+
+
+# Figure tái sử dụng / Reusable wheel figures
+# Một Figure dựng sẵn cho một tập vị trí: mỗi khung hình chỉ đổi góc của các wedge và vị trí nhãn,
+# không tạo thêm artist nào. Figure không an toàn giữa các luồng nên mỗi lúc chỉ một luồng được mượn.
+class WheelFigure:
+    def __init__(self, positions):
+        self.positions = tuple(positions)
+        self.fig, self.ax = new_wheel_axes()
+        
+        draw_wheel_background(self.ax)
+        self.wedges = draw_wheel_sectors(self.ax, self.positions)
+        self.labels = draw_wheel_labels(self.ax, self.positions)
+        draw_wheel_foreground(self.ax)
+    
+    # Xoay vòng quay tới góc angle; labels=False ẩn nhãn (khung hình quay nhanh)
+    def update(self, angle=0, labels=True):
+        theta2 = 360 / len(self.positions)
+        for i, wedge in enumerate(self.wedges):
+            wedge.set_theta1(angle + i * theta2)
+            wedge.set_theta2(angle + (i + 1) * theta2)
+        
+        for (mid_angle, _), artists in zip(wheel_labels(self.positions, angle), self.labels):
+            transform = text_transform(self.ax, WHEEL_TEXT_RADIUS * np.cos(mid_angle), WHEEL_TEXT_RADIUS * np.sin(mid_angle))
+            for artist in artists:
+                artist.set_transform(transform)
+                artist.set_visible(labels)
+        return self.fig
+    
+    def close(self):
+        release_figure(self.fig)
+        self.wedges = self.labels = []
+
+
+# Kho Figure dùng chung cho cả tiến trình: giữ tối đa maxsize Figure rảnh (theo tập vị trí dùng gần nhất),
+# Figure thừa khi trả lại hoặc của vòng quay cũ bị giải phóng ngay
+class WheelFigurePool:
+    def __init__(self, maxsize=4):
+        self.maxsize = maxsize
+        self._idle = OrderedDict()  # positions -> [WheelFigure, ...]
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.released = 0
+    
+    # Mượn một Figure đã xoay tới góc angle, trả lại kho khi ra khỏi khối with
+    @contextmanager
+    def wheel(self, positions, angle=0, labels=True):
+        positions = tuple(positions)
+        with self._lock:
+            idle = self._idle.get(positions)
+            figure = idle.pop() if idle else None
+            if figure:
+                self.reused += 1
+            else:
+                self.created += 1
+        
+        figure = figure or WheelFigure(positions)
+        try:
+            yield figure.update(angle, labels)
+        finally:
+            self._give_back(figure)
+    
+    def _give_back(self, figure):
+        with self._lock:
+            self._idle.setdefault(figure.positions, []).append(figure)
+            self._idle.move_to_end(figure.positions)
+            evicted = []
+            while sum(len(idle) for idle in self._idle.values()) > self.maxsize:
+                positions, idle = next(iter(self._idle.items()))
+                evicted.append(idle.pop(0))
+                if not idle:
+                    del self._idle[positions]
+            self.released += len(evicted)
+        
+        for figure in evicted:
+            figure.close()
+    
+    def clear(self):
+        with self._lock:
+            evicted = [figure for idle in self._idle.values() for figure in idle]
+            self._idle.clear()
+            self.released += len(evicted)
+        for figure in evicted:
+            figure.close()
+    
+    def stats(self):
+        with self._lock:
+            idle = sum(len(figures) for figures in self._idle.values())
+        return {'idle': idle, 'created': self.created, 'reused': self.reused, 'released': self.released}
+
+
+# Chế độ raster: vẽ lớp quay một lần rồi xoay mảng ảnh bằng NumPy cho từng khung hình
+# Raster mode: rasterize the rotating layer once, rotate the pixels for every frame
+WHEEL_RASTER_RADIUS = 0.93  # Bán kính (đơn vị dữ liệu) của vùng quay, bao trọn các wedge
+WHEEL_RASTER_STEPS = 4096   # Số bước góc của ảnh cực (lũy thừa của 2), ~0.09° mỗi bước
+
+
+# Vẽ một lớp ra mảng RGBA (alpha nhân trước, float32), cắt theo khung trục [-1, 1]
+# Trả về thêm kết quả của hàm vẽ và gốc tọa độ (pixel) của khung cắt trên canvas
+def rasterize_wheel_layer(draw):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    
+    fig, ax = new_wheel_axes()
+    drawn = draw(ax)
+    canvas = FigureCanvasAgg(fig)
+    canvas.draw()
+    
+    rgba = np.asarray(canvas.buffer_rgba())
+    x0, y0, x1, y1 = np.round(ax.get_window_extent().extents).astype(int)
+    height = rgba.shape[0]
+    layer = rgba[height - y1:height - y0, x0:x1].astype(np.float32) / 255
+    layer[..., :3] *= layer[..., 3:]
+    return layer, drawn, (x0, y1)
+
+
+# Chuyển RGBA alpha nhân trước (float) về RGBA uint8 gói trong uint32
+def pack_rgba(premultiplied):
+    alpha = premultiplied[..., 3:]
+    rgb = np.divide(premultiplied[..., :3], alpha, out=np.zeros_like(premultiplied[..., :3]), where=alpha > 0)
+    rgba = np.concatenate([rgb, alpha], axis=-1)
+    rgba = (np.clip(rgba, 0, 1) * 255 + 0.5).astype(np.uint8)
+    return np.ascontiguousarray(rgba).view(np.uint32)[..., 0]
+
+
+# Mở gói uint32 về RGBA alpha nhân trước (float32)
+def unpack_rgba(packed):
+    rgba = packed.view(np.uint8).reshape(-1, 4).astype(np.float32) / 255
+    rgba[:, :3] *= rgba[:, 3:]
+    return rgba
+
+
+# Lớp tĩnh (nền + mũi tên) và lưới tọa độ cực của điểm ảnh, dùng chung cho mọi vòng quay
+@functools.lru_cache(maxsize=None)
+def wheel_static_layers():
+    background, _, _ = rasterize_wheel_layer(draw_wheel_background)
+    foreground, _, _ = rasterize_wheel_layer(draw_wheel_foreground)
+    height, width = background.shape[:2]
+    
+    # Ảnh ghép sẵn nền + lớp trên, dùng cho vùng không quay
+    base = pack_rgba(foreground + (1 - foreground[..., 3:]) * background).ravel()
+    
+    # Tọa độ cực của tâm từng điểm ảnh so với tâm vòng quay (trục y hướng lên)
+    rows, cols = np.mgrid[0:height, 0:width].astype(np.float32)
+    x = cols + 0.5 - width / 2
+    y = height / 2 - (rows + 0.5)
+    radius = np.hypot(x, y).ravel()
+    theta = np.degrees(np.arctan2(y, x)).ravel() % 360
+    
+    # Chỉ xoay các điểm ảnh trong đĩa mà lớp trên không che kín
+    max_radius = WHEEL_RASTER_RADIUS * min(width, height) / 2
+    fg_alpha = foreground.reshape(-1, 4)[:, 3]
+    region = np.flatnonzero((radius <= max_radius) & (fg_alpha < 1))
+    
+    return {
+        'shape': (height, width),
+        'base': base,
+        'background': background.reshape(-1, 4),
+        'foreground': foreground.reshape(-1, 4),
+        'region': region,
+        'radius_index': np.round(radius[region]).astype(np.intp),
+        'theta_index': np.round(theta[region] * WHEEL_RASTER_STEPS / 360).astype(np.intp) % WHEEL_RASTER_STEPS,
+        'max_radius': int(np.ceil(max_radius)),
+    }
+
+
+# Lớp quay cho một tập vị trí, lấy mẫu lại sang tọa độ cực (bán kính x góc)
+# để mỗi khung hình chỉ cần dịch chỉ số góc thay vì nội suy lại cả ảnh.
+# Nhãn được cắt thành ảnh nhỏ riêng để luôn giữ chữ nằm ngang như khi vẽ bằng Figure.
+@functools.lru_cache(maxsize=16)
+def wheel_sector_layer(positions):
+    from matplotlib.transforms import Bbox
+    
+    static = wheel_static_layers()
+    height, width = static['shape']
+    layer, _, _ = rasterize_wheel_layer(lambda ax: draw_wheel_sectors(ax, list(positions)))
+    
+    # Ảnh nhỏ của từng nhãn, kèm độ lệch góc trên-trái so với tâm nhãn
+    label_layer, label_artists, (x0, y1) = rasterize_wheel_layer(lambda ax: draw_wheel_labels(ax, list(positions)))
+    sprites = []
+    for (mid_angle, _), artists in zip(wheel_labels(positions), label_artists):
+        bx0, by0, bx1, by1 = Bbox.union([artist.get_window_extent() for artist in artists]).extents
+        col0, col1 = int(np.floor(bx0)) - x0 - 2, int(np.ceil(bx1)) - x0 + 2
+        row0, row1 = y1 - int(np.ceil(by1)) - 2, y1 - int(np.floor(by0)) + 2
+        center_col = width / 2 * (1 + WHEEL_TEXT_RADIUS * np.cos(mid_angle))
+        center_row = height / 2 * (1 - WHEEL_TEXT_RADIUS * np.sin(mid_angle))
+        sprites.append((label_layer[row0:row1, col0:col1].copy(), col0 - center_col, row0 - center_row))
+    
+    # Nội suy song tuyến một lần duy nhất khi dựng ảnh cực
+    radius = np.arange(static['max_radius'] + 1, dtype=np.float32)[:, None]
+    theta = np.radians(np.arange(WHEEL_RASTER_STEPS, dtype=np.float32) * 360 / WHEEL_RASTER_STEPS)[None, :]
+    src_col = np.clip(radius * np.cos(theta) + width / 2 - 0.5, 0, width - 1.001)
+    src_row = np.clip(height / 2 - 0.5 - radius * np.sin(theta), 0, height - 1.001)
+    c0 = np.floor(src_col)
+    r0 = np.floor(src_row)
+    fc = (src_col - c0)[..., None]
+    fr = (src_row - r0)[..., None]
+    c0 = c0.astype(np.intp)
+    r0 = r0.astype(np.intp)
+    top = layer[r0, c0] * (1 - fc) + layer[r0, c0 + 1] * fc
+    bottom = layer[r0 + 1, c0] * (1 - fc) + layer[r0 + 1, c0 + 1] * fc
+    polar = pack_rgba(top * (1 - fr) + bottom * fr)
+    
+    # Vòng bán kính nào kín màu (alpha = 255) thì không cần trộn với nền
+    opaque_rows = (polar.view(np.uint8).reshape(polar.shape + (4,))[..., 3] == 255).all(axis=1)
+    fg_alpha = static['foreground'][static['region'], 3]
+    mixed = ~opaque_rows[static['radius_index']] | (fg_alpha > 0)
+    
+    return polar.ravel(), np.flatnonzero(~mixed), np.flatnonzero(mixed), sprites
+
+
+# Ghép lớp quay đã xoay giữa lớp nền và lớp trên, trả về ảnh RGBA uint8
+def render_wheel_frame(positions, angle=0, labels=True):
+    static = wheel_static_layers()
+    polar, simple, mixed, sprites = wheel_sector_layer(tuple(positions))
+    region = static['region']
+    
+    # Xoay = dịch chỉ số góc trên ảnh cực (ngược chiều kim đồng hồ)
+    shift = int(round(angle * WHEEL_RASTER_STEPS / 360))
+    theta_index = (static['theta_index'] - shift) & (WHEEL_RASTER_STEPS - 1)
+    rotated = polar[static['radius_index'] * WHEEL_RASTER_STEPS + theta_index]
+    
+    frame = static['base'].copy()
+    frame[region[simple]] = rotated[simple]
+    
+    # Chỉ trộn alpha cho các điểm ảnh ở viền và dưới mũi tên / vòng tròn giữa
+    mixed_idx = region[mixed]
+    rot = unpack_rgba(rotated[mixed])
+    bg = static['background'][mixed_idx]
+    fg = static['foreground'][mixed_idx]
+    frame[mixed_idx] = pack_rgba(fg + (1 - fg[:, 3:]) * (rot + (1 - rot[:, 3:]) * bg))
+    
+    # Dán nhãn tại vị trí mới (nhãn nằm ngoài vòng tròn giữa và mũi tên nên không bị che)
+    height, width = static['shape']
+    image = frame.reshape(static['shape'])
+    for (sprite, col_offset, row_offset), (mid_angle, _) in zip(sprites if labels else [], wheel_labels(positions, angle)):
+        col = int(round(width / 2 * (1 + WHEEL_TEXT_RADIUS * np.cos(mid_angle)) + col_offset))
+        row = int(round(height / 2 * (1 - WHEEL_TEXT_RADIUS * np.sin(mid_angle)) + row_offset))
+        box = image[row:row + sprite.shape[0], col:col + sprite.shape[1]]
+        under = unpack_rgba(box.ravel()).reshape(sprite.shape)
+        box[...] = pack_rgba(sprite + (1 - sprite[..., 3:]) * under)
+    
+    return frame.view(np.uint8).reshape(static['shape'] + (4,))
+
+
+# Mã hóa khung hình raster thành PNG (nén nhanh, ảnh chỉ hiển thị trong thời gian ngắn)
+# reduce > 1 thu nhỏ ảnh theo hệ số nguyên (lọc trung bình khối) trước khi mã hóa
+def encode_wheel_frame(frame, reduce=1):
+    from PIL import Image
+    
+    image = Image.fromarray(frame)
+    if reduce > 1:
+        image = image.reduce(reduce)
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', compress_level=1)
+    return buffer.getvalue()
+
+
+# Mã hóa Figure thành PNG (giống st.pyplot: dpi 200, cắt sát viền)
+def encode_figure(fig, dpi=200):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', bbox_inches='tight', dpi=dpi)
+    return buffer.getvalue()
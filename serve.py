@@ -0,0 +1,45 @@
+# Chạy ứng dụng kèm bước làm nóng / Launch the app with a warm-up run
+# python serve.py [tùy chọn của streamlit run, ví dụ --server.port 8502]
+# Ngay khi máy chủ lên, women.py được chạy một lần ngay trong tiến trình qua kiểm tra sức khỏe của Streamlit
+# (server.scriptHealthCheckEnabled), nên các cache dùng chung đã được dựng trước khi người xem đầu tiên kết nối.
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from streamlit import config
+from streamlit.runtime import Runtime
+from streamlit.web import cli
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'women.py')
+WARM_UP_TIMEOUT = 120  # Giây chờ máy chủ lên và chạy xong trang
+
+
+# Chờ máy chủ nhận kết nối rồi gọi kiểm tra sức khỏe một lần (lần chạy này dựng các cache)
+def warm_up_when_ready():
+    deadline = time.time() + WARM_UP_TIMEOUT
+    started = time.perf_counter()
+    while time.time() < deadline:
+        if not Runtime.exists():
+            time.sleep(0.5)  # Streamlit chưa đọc xong cấu hình
+            continue
+        base = config.get_option('server.baseUrlPath').strip('/')
+        url = f"http://localhost:{config.get_option('server.port')}/{base + '/' if base else ''}_stcore/script-health-check"
+        try:
+            with urllib.request.urlopen(url, timeout=WARM_UP_TIMEOUT) as response:
+                print(f"Làm nóng xong sau {time.perf_counter() - started:.1f}s: {response.read().decode()}", flush=True)
+            return
+        except urllib.error.HTTPError as error:
+            print(f"Làm nóng lỗi: {error.code} {error.read().decode()}", flush=True)
+            return
+        except OSError:
+            time.sleep(0.5)  # Máy chủ chưa lên
+    print("Làm nóng: máy chủ không phản hồi", flush=True)
+
+
+if __name__ == '__main__':
+    threading.Thread(target=warm_up_when_ready, name='warm-up', daemon=True).start()
+    sys.argv = ['streamlit', 'run', APP_PATH, '--server.scriptHealthCheckEnabled', 'true'] + sys.argv[1:]
+    sys.exit(cli.main())
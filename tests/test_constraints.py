@@ -0,0 +1,73 @@
+# Bộ giải ràng buộc: không bao giờ dẫn vào ngõ cụt khi còn cách xếp hợp lệ
+import itertools
+
+import numpy as np
+import pytest
+
+from draw_engine.constraints import DrawRules
+from draw_engine.state import DrawState, commit_draw, make_positions, make_result_table, position_group, run_draw
+
+
+def new_state(groups, slots):
+    return DrawState(positions=make_positions(groups, slots), result_table=make_result_table(groups, slots))
+
+
+# Vét cạn: có cách chia đội vào bảng (đủ sức chứa, không cặp cấm nào chung bảng) không
+def brute_force_feasible(rules, teams, groups, slots):
+    for assignment in itertools.product(groups, repeat=len(teams)):
+        if any(assignment.count(group) > slots for group in groups):
+            continue
+        placed = dict(zip(teams, assignment))
+        if all(placed[a] != placed[b] for a in rules.conflicts for b in rules.conflicts[a] if a in placed and b in placed):
+            return True
+    return False
+
+
+def random_rules(rng, teams, n_pairs):
+    pairs = [tuple(rng.choice(teams, 2, replace=False)) for _ in range(n_pairs)]
+    return DrawRules(forbidden=pairs)
+
+
+def assert_respects(rules, state):
+    placed = {team: position_group(position) for team, position in state.results.items()}
+    for team, others in rules.conflicts.items():
+        for other in others:
+            if team in placed and other in placed:
+                assert placed[team] != placed[other], (team, other)
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_feasible_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    teams = [f"T{i}" for i in range(6)]
+    groups, slots = ['A', 'B', 'C'], 2
+    rules = random_rules(rng, teams, int(rng.integers(1, 9)))
+    assert rules.feasible(new_state(groups, slots), teams) == brute_force_feasible(rules, teams, groups, slots)
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_draw_never_dead_ends(seed):
+    rng = np.random.default_rng(seed)
+    teams = [f"T{i}" for i in range(8)]
+    groups, slots = ['A', 'B', 'C', 'D'], 2
+    rules = random_rules(rng, teams, int(rng.integers(1, 12)))
+    if not brute_force_feasible(rules, teams, groups, slots):
+        pytest.skip("luật ngẫu nhiên không có lời giải")
+    
+    # Bốc từng đội vào một vị trí bất kỳ trong số vị trí được phép: luôn xếp hết và đúng luật
+    state = new_state(groups, slots)
+    for team in rng.permutation(teams):
+        allowed = rules.allowed_positions(state, team, teams)
+        assert allowed, f"ngõ cụt ở đội {team}"
+        commit_draw(state, team, allowed[int(rng.integers(len(allowed)))], 0)
+    assert len(state.results) == len(teams)
+    assert_respects(rules, state)
+
+
+def test_run_draw_with_pots_and_seeds():
+    teams = [f"T{i}" for i in range(16)]
+    rules = DrawRules(forbidden=[("T1", "T2")], pots=[teams[4:8], teams[8:12]], seeds=teams[:4])
+    for seed in range(10):
+        state = run_draw(new_state(['A', 'B', 'C', 'D'], 4), teams, seed, rules)
+        assert len(state.results) == len(teams)
+        assert_respects(rules, state)
@@ -0,0 +1,57 @@
+# Nhật ký bốc thăm: dựng lại và phát lại cho đúng bảng kết quả đã ghi
+from types import SimpleNamespace
+
+from draw_engine import journal as draw_journal
+from draw_engine.constraints import DEPARTMENT_RULES
+from draw_engine.state import Tournament, draw_remaining
+
+
+def record_draw(path, tournament, seed):
+    journal = draw_journal.DrawJournal(str(path))
+    state = draw_journal.fresh_state(tournament)
+    for spin in draw_remaining(state, tournament.teams, seed, DEPARTMENT_RULES):
+        journal.record_draw(spin['team'], spin['position'], spin['angles'][-1], spin['seed'], spin['start_angle'],
+                            targeted=True)
+    return journal, state
+
+
+def test_restore_reproduces_table(tmp_path):
+    tournament = Tournament()
+    journal, state = record_draw(tmp_path / 'draw.jsonl', tournament, 3)
+    restored = draw_journal.restore(SimpleNamespace(), journal.draws(), tournament)
+    assert restored.result_table == state.result_table
+    assert restored.results == state.results
+    assert restored.wheel_angle == state.wheel_angle
+
+
+def test_replay_reproduces_every_spin(tmp_path):
+    tournament = Tournament()
+    journal, state = record_draw(tmp_path / 'draw.jsonl', tournament, 11)
+    spins = draw_journal.replay_spins(journal.draws(), tournament, DEPARTMENT_RULES, tournament.teams)
+    assert all(spin['reproduced'] for spin in spins)
+    assert {spin['team']: spin['position'] for spin in spins} == state.results
+
+
+def test_reset_and_truncated_line(tmp_path):
+    tournament = Tournament()
+    path = tmp_path / 'draw.jsonl'
+    journal, _ = record_draw(path, tournament, 5)
+    journal.record_reset()
+    journal.record_draw(tournament.teams[0], 'A1', 0.0)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"event": "draw", "team"')  # Máy tắt khi đang ghi
+    
+    restored = draw_journal.restore(SimpleNamespace(), journal.draws(), tournament)
+    assert restored.results == {tournament.teams[0]: 'A1'}
+
+
+def test_foreign_teams_are_skipped(tmp_path):
+    tournament = Tournament()
+    draws = [
+        {'team': 'ĐỘI KHÁC', 'position': 'A1', 'final_angle': 0.0},
+        {'team': tournament.teams[0], 'position': 'A1', 'final_angle': 10.0},
+    ]
+    restored = draw_journal.restore(SimpleNamespace(), draws, tournament)
+    assert restored.results == {tournament.teams[0]: 'A1'}
+    spins = draw_journal.replay_spins(draws, tournament, None, tournament.teams)
+    assert [spin['team'] for spin in spins] == [tournament.teams[0]]
@@ -0,0 +1,50 @@
+# Cấu hình giải: lỗi cấu hình được báo khi nạp thay vì khi đang bốc thăm
+import pytest
+
+from draw_engine.state import DrawState, commit_draw, plan_spin, tournament_from_config
+
+
+def fresh(tournament):
+    return DrawState(positions=tournament.positions(), result_table=tournament.result_table())
+
+
+# Tên bảng kết thúc bằng chữ số: trước đây nạp được nhưng commit_draw lỗi KeyError: 'G'
+def test_group_name_ending_in_digit_is_rejected():
+    with pytest.raises(ValueError):
+        tournament_from_config({'teams': ['a', 'b'], 'groups': ['G1', 'G2'], 'slots_per_group': 2})
+
+
+def test_digit_free_group_names_commit():
+    tournament = tournament_from_config({'teams': ['a', 'b'], 'groups': ['Gx', 'Gy'], 'slots_per_group': 2})
+    state = fresh(tournament)
+    commit_draw(state, 'a', 'Gy2', 0)
+    assert state.result_table == {'Gx': [None, None], 'Gy': [None, 'a']}
+
+
+# Luật không thỏa mãn được: trước đây chỉ lỗi (ValueError không được bắt) khi bấm Bốc thăm
+def test_infeasible_rules_are_rejected_on_load():
+    config = {'teams': ['WW P1', 'WW P2', 'GA'], 'groups': 1, 'slots_per_group': 4, 'forbidden': [['WW P1', 'WW P2']]}
+    with pytest.raises(ValueError):
+        tournament_from_config(config)
+
+
+def test_rules_come_from_config():
+    tournament = tournament_from_config({'teams': ['WW P1', 'WW P2', 'GA'], 'groups': 1, 'slots_per_group': 4})
+    assert not tournament.rules
+    state = fresh(tournament)
+    position, _ = plan_spin(state, 0, 'WW P1', tournament.rules, tournament.teams)
+    assert position in state.available_positions
+    
+    tournament = tournament_from_config({'teams': ['a', 'b', 'c', 'd'], 'groups': 2, 'slots_per_group': 2,
+                                         'forbidden': [['a', 'b']], 'seeds': ['c', 'd']})
+    assert tournament.rules.conflicts['a'] == {'b'}
+    assert tournament.rules.conflicts['c'] == {'d'}
+
+
+def test_position_already_taken():
+    tournament = tournament_from_config({'teams': ['a', 'b'], 'groups': 1, 'slots_per_group': 2})
+    state = fresh(tournament)
+    commit_draw(state, 'a', 'A1', 0)
+    with pytest.raises(ValueError):
+        commit_draw(state, 'b', 'A1', 0)
+    assert state.results == {'a': 'A1'} and state.used_teams == ['a']
@@ -0,0 +1,36 @@
+# Quỹ đạo vòng quay: khung hình cuối (và đuôi nảy) luôn dừng trong phần tử đích
+import numpy as np
+import pytest
+
+from draw_engine.geometry import selected_position, selected_positions
+from draw_engine.state import make_positions
+from draw_engine.trajectory import EASINGS, spin_trajectory
+
+
+@pytest.mark.parametrize('n_sectors', [1, 2, 3, 8, 13, 32, 64])
+@pytest.mark.parametrize('wrap', [True, False])
+def test_last_frame_lands_in_target(n_sectors, wrap):
+    rng = np.random.default_rng(n_sectors)
+    positions = [f"P{i}" for i in range(n_sectors)]
+    for _ in range(50):
+        start = float(rng.uniform(-720, 720))
+        target = int(rng.integers(n_sectors))
+        angles = spin_trajectory(start, target, n_sectors, n_frames=20, rng=rng, bounce=0, wrap=wrap)
+        assert selected_position(positions, angles[-1]) == positions[target]
+
+
+@pytest.mark.parametrize('easing', sorted(EASINGS))
+def test_bounce_tail_stays_in_target(easing):
+    positions = make_positions(['A', 'B', 'C', 'D'], 4)
+    rng = np.random.default_rng(0)
+    for target in range(len(positions)):
+        angles = spin_trajectory(float(rng.uniform(0, 360)), target, len(positions), n_frames=30,
+                                 easing=easing, rng=rng)
+        tail = angles[30 - 1:]
+        assert set(selected_positions(positions, tail)) == {positions[target]}
+
+
+def test_same_seed_same_trajectory():
+    first = spin_trajectory(12.5, 3, 8, n_frames=40, rng=7)
+    second = spin_trajectory(12.5, 3, 8, n_frames=40, rng=7)
+    np.testing.assert_array_equal(first, second)
@@ -1,17 +1,176 @@
 import streamlit as st
-import random
+import streamlit.components.v1 as components
+from streamlit.logger import get_logger
 import time
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.patches import Wedge, Circle, Polygon
-from matplotlib.figure import Figure
-import base64
-import math
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, nullcontext
+from draw_engine import journal as draw_journal
+from draw_engine.assets import audio_uri, font_face_css
+from draw_engine import state as draw_state
+from draw_engine.broadcast import BroadcastHub
+from draw_engine.framecache import FrameCache, quantize_angle
+from draw_engine.i18n import compile_catalog
+from draw_engine.instrument import JsonlExporter, MemoryTracker, Profiler
+from draw_engine.prerender import PrerenderBudget, prerender_spin, prerender_trajectory
+from draw_engine.scheduler import FrameScheduler
+from draw_engine.svg import wheel_svg
+from draw_engine.trajectory import bounce_frame_count
+from draw_engine.warmup import engine_steps, warm_up
+from draw_engine.wheel import (WHEEL_COLORS, WheelFigurePool, encode_figure, encode_wheel_frame, label_size, label_stride,
+                               render_wheel_frame)
 
 # Thiết lập trang / Page setup
 st.set_page_config(page_title="Bốc Thăm Bảng Đấu / Draw Tournament Groups", layout="wide")
 
+# Đo thời gian từng bước của lần chạy này / Per-rerun timing
+# ?debug=1 hoặc DRAW_DEBUG=1: hiện bảng thời gian ở thanh bên
+# DRAW_PROFILE_PATH=<tệp.jsonl>: ghi thêm các span của mỗi lần chạy vào tệp để phân tích sau
+# DRAW_TRACEMALLOC=1: bật tracemalloc, thanh bên gỡ lỗi hiện các dòng mã cấp phát tăng nhiều nhất (chậm hơn)
+profiler = Profiler()
+page_rendered = False  # Đã chạy xong cả trang; sau đó chỉ khu vực bốc thăm (fragment) có thể chạy lại
+DEBUG_PANEL = os.environ.get('DRAW_DEBUG') == '1' or st.query_params.get('debug') == '1'
+PROFILE_PATH = os.environ.get('DRAW_PROFILE_PATH')
+TRACE_MEMORY = os.environ.get('DRAW_TRACEMALLOC') == '1'
+
+# Chế độ vẽ vòng quay / Wheel rendering mode
+# 'client': trình duyệt tự quay vòng quay (canvas), máy chủ chỉ gửi góc đích một lần
+# 'raster': xoay ảnh đã vẽ sẵn (nhanh), 'figure': vẽ lại Figure matplotlib cho mỗi khung hình
+# 'svg': chuỗi SVG vài KB mỗi khung hình, không cần matplotlib
+WHEEL_RENDER_MODE = os.environ.get('WHEEL_RENDER_MODE', 'client')
+WHEEL_DPI = 200  # Độ phân giải ảnh Figure (giống mặc định của st.pyplot)
+WHEEL_FRAME_CACHE_SIZE = 128  # Số ảnh vòng quay đã mã hóa giữ lại cho mọi phiên
+HTML_CACHE_SIZE = 1024  # Số mảnh HTML (bảng, hàng, ô, dải thông báo, CSS) giữ lại cho mọi phiên
+WHEEL_PRERENDER_WORKERS = 2  # Số luồng nền vẽ trước khung hình của lượt quay tiếp theo
+WHEEL_PRERENDER_SPINS = 8  # Số lượt quay vẽ trước (mỗi tab một lượt) được giữ khung hình trong cả tiến trình
+WHEEL_FIGURE_POOL_SIZE = 4  # Số Figure rảnh giữ lại để dùng lại ở chế độ 'figure'
+SERVER_SPIN_SECONDS = 5  # Thời lượng lượt quay phát từ máy chủ, không phụ thuộc tốc độ vẽ
+SERVER_SPIN_FPS = 8  # Số khung hình mục tiêu mỗi giây khi phát từ máy chủ
+SPIN_DEADLINE_SECONDS = 3 * SERVER_SPIN_SECONDS  # Quá thời gian này lượt quay chưa xong được coi là bị bỏ dở
+SPIN_FRAMES = SERVER_SPIN_SECONDS * SERVER_SPIN_FPS - bounce_frame_count()  # Khung hình chuyển động, chưa kể đuôi nảy
+BATCH_SPIN_SECONDS = 1  # Hoạt ảnh rút gọn cho mỗi đội khi bốc thăm tất cả (0: gán ngay, không hoạt ảnh)
+BATCH_SPIN_FRAMES = 8  # Số khung hình mỗi lượt quay rút gọn (không có đuôi nảy)
+BATCH_MAX_SPINS = 16  # Còn nhiều đội hơn thì gán ngay: mỗi lượt là một vòng quay khác cần vẽ lại từ đầu
+
+# Cấu hình giải (đội, bảng, số vị trí mỗi bảng, tiêu đề, luật bốc thăm): mặc định 8 đội / 2 bảng A, B
+# và luật hai đội cùng bộ phận không chung bảng (các khóa xem draw_state.tournament_from_config)
+# Đặt DRAW_TOURNAMENT=<tệp JSON> để dùng cho giải khác, ví dụ cúp liên nhà máy
+# Nhiều giải trên cùng máy chủ: DRAW_TOURNAMENTS=<tệp JSON {"<mã giải>": <cấu hình giải>, ...}>, chọn bằng
+# ?tournament=<mã giải> (không có thì là giải đầu tiên). Mỗi giải có trạng thái, nhật ký và trình chiếu riêng,
+# cache ảnh vòng quay và Figure dùng chung vì chỉ phụ thuộc các vị trí trên vòng quay.
+# Tệp cấu hình được đọc một lần cho mỗi tiến trình (không đọc lại ở mỗi lần chạy lại hay mỗi lần khán giả
+# tự tải lại), nên các trình chiếu chung luôn khớp với danh sách giải; sửa tệp thì khởi động lại máy chủ.
+@st.cache_resource(show_spinner=False)
+def get_tournaments():
+    if os.environ.get('DRAW_TOURNAMENTS'):
+        return draw_state.load_tournaments(os.environ['DRAW_TOURNAMENTS'])
+    return {'default': draw_state.load_tournament(os.environ['DRAW_TOURNAMENT']) if os.environ.get('DRAW_TOURNAMENT')
+            else draw_state.Tournament()}
+
+try:
+    TOURNAMENTS = get_tournaments()
+except ValueError as error:
+    st.error(f"Cấu hình giải không hợp lệ / Invalid tournament config: {error}")
+    st.stop()
+
+tournament_id = st.query_params.get('tournament', next(iter(TOURNAMENTS)))
+if tournament_id not in TOURNAMENTS:
+    st.error(f"Không có giải '{tournament_id}' / Unknown tournament. ?tournament=" + " | ".join(TOURNAMENTS))
+    st.stop()
+tournament = TOURNAMENTS[tournament_id]
+DRAW_RULES = tournament.rules  # Ràng buộc bốc thăm của giải (giải mặc định: hai đội cùng bộ phận không chung bảng)
+
+# Nhật ký bốc thăm: đặt DRAW_JOURNAL=<tệp JSONL> để mỗi kết quả được ghi xuống đĩa ngay khi có,
+# trang tải lại hay máy chủ khởi động lại sẽ dựng lại kết quả từ nhật ký. ?replay=1 phát lại lượt bốc thăm đã ghi.
+# Nhật ký chỉ gắn với lượt bốc thăm chung (?broadcast=presenter, xem bên dưới): chỉ người điều khiển ghi
+# và chỉ trạng thái chung được dựng lại. Các phiên mở riêng (không có ?broadcast) bốc thăm độc lập,
+# không ghi và không tiếp tục từ nhật ký (nếu không, các tab sẽ ghi xen kẽ vào cùng một tệp và Bắt đầu lại
+# ở một tab sẽ xóa điểm khôi phục của tab khác); chúng chỉ đọc nhật ký khi phát lại với ?replay=1.
+# Khi có nhiều giải, mỗi giải ghi một tệp riêng (xem draw_journal.journal_path)
+DRAW_JOURNAL_PATH = os.environ.get('DRAW_JOURNAL')
+
+def tournament_journal_path(tournament_id):
+    if len(TOURNAMENTS) > 1 or '{tournament}' in DRAW_JOURNAL_PATH:
+        return draw_journal.journal_path(DRAW_JOURNAL_PATH, tournament_id)
+    return DRAW_JOURNAL_PATH
+
+# Component vòng quay phía trình duyệt / Client-side wheel component
+spin_wheel = components.declare_component(
+    "spin_wheel", path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "components", "spin_wheel")
+)
+SPIN_SECONDS = 5  # Thời gian quay trên trình duyệt (giây)
+SPIN_FPS = 60  # Số khung hình quỹ đạo mỗi giây gửi cho trình duyệt
+
+# Trình chiếu chung / Broadcast mode
+# ?broadcast=presenter: điều khiển lượt bốc thăm chung của cả máy chủ
+# ?broadcast=viewer: khán giả (máy chiếu, điện thoại) chỉ xem, không vẽ lại riêng cho từng phiên
+# Mỗi giải có một lượt trình chiếu riêng (thêm &tournament=<mã giải>)
+# Nếu đặt biến môi trường BROADCAST_TOKEN thì người điều khiển phải thêm &token=<BROADCAST_TOKEN>
+BROADCAST_TOKEN = os.environ.get('BROADCAST_TOKEN')
+VIEWER_REFRESH_SECONDS = 15  # Khán giả tự tải lại sau thời gian này dù không có thay đổi
+
+@st.cache_resource(show_spinner=False)
+def get_journal(path):
+    return draw_journal.DrawJournal(path)
+
+journal = get_journal(tournament_journal_path(tournament_id)) if DRAW_JOURNAL_PATH else None
+
+# Trạng thái trình chiếu chung của một giải, dựng lại từ nhật ký của giải đó
+@st.cache_resource(show_spinner=False)
+def get_broadcast_hub(tournament_id):
+    hub = BroadcastHub(TOURNAMENTS[tournament_id])
+    if DRAW_JOURNAL_PATH:
+        draw_journal.restore(hub.state, get_journal(tournament_journal_path(tournament_id)).draws(), TOURNAMENTS[tournament_id])
+    return hub
+
+# Cache ảnh vòng quay dùng chung cho cả tiến trình
+@st.cache_resource(show_spinner=False)
+def get_frame_cache():
+    return FrameCache(maxsize=WHEEL_FRAME_CACHE_SIZE)
+
+# Cache mảnh HTML dùng chung (cùng kiểu LRU với ảnh vòng quay): lần chạy lại mà bảng kết quả
+# không đổi chỉ còn tra cache thay vì nối chuỗi lại
+@st.cache_resource(show_spinner=False)
+def get_html_cache():
+    return FrameCache(maxsize=HTML_CACHE_SIZE)
+
+# Luồng nền vẽ trước khung hình, dùng chung cho cả tiến trình
+@st.cache_resource(show_spinner=False)
+def get_prerender_pool():
+    return ThreadPoolExecutor(max_workers=WHEEL_PRERENDER_WORKERS, thread_name_prefix='wheel-prerender')
+
+# Figure dùng lại giữa các khung hình thay vì dựng mới (chế độ 'figure')
+@st.cache_resource(show_spinner=False)
+def get_figure_pool():
+    return WheelFigurePool(maxsize=WHEEL_FIGURE_POOL_SIZE)
+
+# Giới hạn bộ nhớ của các lượt quay vẽ trước mà các phiên đang giữ
+@st.cache_resource(show_spinner=False)
+def get_prerender_budget():
+    return PrerenderBudget(max_spins=WHEEL_PRERENDER_SPINS)
+
+@st.cache_resource(show_spinner=False)
+def get_profile_exporter(path):
+    return JsonlExporter(path)
+
+# Theo dõi bộ nhớ tiến trình và các phiên đã thấy (để đếm số phiên còn mở)
+@st.cache_resource(show_spinner=False)
+def get_memory_tracker():
+    return MemoryTracker(trace=TRACE_MEMORY), set()
+
+frame_cache = get_frame_cache()
+html_cache = get_html_cache()
+figure_pool = get_figure_pool()
+prerender_budget = get_prerender_budget()
+memory_tracker, seen_sessions = get_memory_tracker()
+
+broadcast_role = st.query_params.get('broadcast')
+if broadcast_role and (broadcast_role != 'presenter' or (BROADCAST_TOKEN and st.query_params.get('token') != BROADCAST_TOKEN)):
+    broadcast_role = 'viewer'
+
 # Ngôn ngữ mặc định / Default language
 if 'language' not in st.session_state:
     st.session_state.language = 'vi'  # 'vi' for Vietnamese, 'en' for English
@@ -27,8 +186,8 @@ translations = {
         'en': "Draw Tournament Groups"
     },
     'teams_left': {
-        'vi': "Còn lại: {}/8 đội",
-        'en': "Remaining: {}/8 teams"
+        'vi': "Còn lại: {count}/{total} đội",
+        'en': "Remaining: {count}/{total} teams"
     },
     'select_team': {
         'vi': "Chọn đội để bốc thăm:",
@@ -38,6 +197,10 @@ translations = {
         'vi': "Bốc thăm",
         'en': "Draw"
     },
+    'draw_all_button': {
+        'vi': "Bốc thăm tất cả",
+        'en': "Draw all"
+    },
     'reset_button': {
         'vi': "Bắt đầu lại",
         'en': "Restart"
@@ -51,8 +214,8 @@ translations = {
         'en': "Spinning the wheel..."
     },
     'result': {
-        'vi': "Kết quả: {} → {}",
-        'en': "Result: {} → {}"
+        'vi': "Kết quả: {team} → {position}",
+        'en': "Result: {team} → {position}"
     },
     'results_header': {
         'vi': "Kết quả bốc thăm",
@@ -63,8 +226,8 @@ translations = {
         'en': "Position"
     },
     'group': {
-        'vi': "Bảng {}",
-        'en': "Group {}"
+        'vi': "Bảng {group}",
+        'en': "Group {group}"
     },
     'language_selector': {
         'vi': "Ngôn ngữ / Language:",
@@ -72,209 +235,222 @@ translations = {
     }
 }
 
+# Từ điển được biên dịch một lần cho mỗi tiến trình thành hàm định dạng theo từng ngôn ngữ
+@st.cache_resource(show_spinner=False)
+def get_catalog():
+    return compile_catalog(translations)
+
+catalog = get_catalog()
+
 # Hàm lấy văn bản theo ngôn ngữ / Function to get text based on language
+# Placeholder có tên: get_text('result', team=..., position=...)
 def get_text(key, **kwargs):
-    text = translations.get(key, {}).get(st.session_state.language, key)
-    if kwargs:
-        return text.format(*kwargs.values())
-    return text
+    formatter = catalog[st.session_state.language].get(key)
+    return formatter(**kwargs) if formatter else key
+
+# Dải thông báo (kết quả, đã bốc thăm xong) theo ngôn ngữ và nội dung, dựng một lần rồi lấy từ cache
+def banner_html(css_class, key, **kwargs):
+    language = st.session_state.language
+    return html_cache.get(('banner', css_class, language, key, tuple(kwargs.items())),
+                          lambda: f'<div class="{css_class}">{get_text(key, **kwargs)}</div>')
 
 # Khởi tạo session state
-if 'positions' not in st.session_state:
-    # Tạo tất cả các vị trí có thể
-    positions = []
-    for group in ['A', 'B']:
-        for i in range(1, 5):
-            positions.append(f"{group}{i}")
-    st.session_state.positions = positions
-
-if 'available_positions' not in st.session_state:
-    st.session_state.available_positions = st.session_state.positions.copy()
-
-if 'results' not in st.session_state:
-    st.session_state.results = {}
-
-if 'spinning' not in st.session_state:
-    st.session_state.spinning = False
-
-if 'wheel_angle' not in st.session_state:
-    st.session_state.wheel_angle = 0
-
-if 'result_table' not in st.session_state:
-    # Khởi tạo bảng kết quả trống
-    st.session_state.result_table = {
-        'A': [None] * 4,  # 4 vị trí cho bảng A
-        'B': [None] * 4,  # 4 vị trí cho bảng B
-    }
+# Khi trình chiếu chung, trạng thái bốc thăm nằm ở hub của tiến trình thay vì từng phiên
+if broadcast_role:
+    hub = get_broadcast_hub(tournament_id)
+    seen_version = hub.version
+    draw = hub.state
+else:
+    hub = None
+    draw = st.session_state
+    if draw.get('tournament_id', tournament_id) != tournament_id:
+        # Phiên chuyển sang giải khác: bỏ toàn bộ trạng thái của giải cũ (chỉ giữ ngôn ngữ)
+        for key in list(draw.keys()):
+            if key != 'language':
+                del draw[key]
+    draw.tournament_id = tournament_id
+    draw_state.init_state(draw, tournament)
 
-# Danh sách 8 đội thi đấu
-all_teams = [
-    "HR - PLANNING", "WW P2", "GA", "FINISHING P1", 
-    "UPH", "WW P1", "INLAY", "FINISHING P2"
-]
+# Mã của phiên này, ghi vào lượt quay mà phiên công bố để nhận ra lượt quay bị ngắt giữa chừng
+session_token = st.session_state.setdefault('session_token', uuid.uuid4().hex)
 
-# Lọc các đội đã được bốc thăm
-if 'used_teams' not in st.session_state:
-    st.session_state.used_teams = []
+# Trạng thái điều khiển lượt quay
+for key, value in [('spinning', False), ('pending_spin', None), ('last_result', None)]:
+    if not hasattr(draw, key):
+        setattr(draw, key, value)
 
-available_teams = [team for team in all_teams if team not in st.session_state.used_teams]
+# Sửa trạng thái bốc thăm; khi trình chiếu chung sẽ báo cho khán giả sau khi sửa xong
+def shared_update():
+    return hub.update() if hub else nullcontext(draw)
 
-# Hàm easeInOutCirc cải tiến
-def easeInOutCirc(x):
-    if x < 0.5:
-        return 0.5 * (1 - math.sqrt(1 - 4 * x * x))
-    else:
-        return 0.5 * (math.sqrt(-((2 * x - 3) * (2 * x - 1))) + 1)
+# Danh sách đội thi đấu
+all_teams = tournament.teams
 
-# Hàm vẽ vòng quay may mắn với góc quay và hiệu ứng 3D - không sử dụng patheffects
-def create_wheel(positions, angle=0):
-    fig = Figure(figsize=(10, 10), dpi=100)
-    ax = fig.add_subplot(111)
-    
-    # Số lượng phần tử trên vòng quay
-    n = len(positions)
-    
-    # Tạo gradient màu hơi sáng để hiển thị đẹp
-    colors = []
-    base_colors = ['#FF5252', '#FF7752', '#FFCA52', '#FFE552', '#B4FF52', '#52FF8F', '#52FFDF', '#52BFFF', '#5275FF', '#8A52FF', '#D452FF', '#FF52C9']
-    
-    for i in range(n):
-        color_idx = i % len(base_colors)
-        colors.append(base_colors[color_idx])
-    
-    # Vẽ các phần tử trên vòng quay
-    theta1 = angle  # Bắt đầu từ góc quay hiện tại
-    theta2 = 360 / n
+# Ảnh PNG (hoặc chuỗi SVG ở chế độ 'svg') của vòng quay theo chế độ vẽ đã chọn
+# Ảnh được lưu theo (chế độ vẽ, vị trí, góc đã lượng tử, dpi, nhãn): đổi ngôn ngữ hay chọn đội khác chỉ tra cache,
+# và khi trình chiếu chung mỗi khung hình chỉ được vẽ một lần cho tất cả người xem
+# scale < 1 và labels=False dùng cho khung hình quay nhanh (trình duyệt vẫn phóng ảnh theo bề rộng cột)
+def wheel_png(positions, angle=0, scale=1.0, labels=True):
+    angle = quantize_angle(angle)
+    dpi = WHEEL_DPI * scale
     
-    wedges = []
-    labels_pos = []
+    # Chỉ chạy khi cache chưa có ảnh; có thể chạy ở luồng vẽ trước (khi đó không đo, xem Profiler.span)
+    # Chế độ 'figure' mượn Figure từ kho (chỉ xoay các wedge và nhãn) và trả lại sau khi mã hóa
+    def build():
+        with ExitStack() as borrowed:
+            with profiler.span('wheel.render', mode=WHEEL_RENDER_MODE, scale=scale):
+                if WHEEL_RENDER_MODE == 'svg':
+                    return wheel_svg(positions, angle, labels)  # Văn bản, không cần mã hóa
+                if WHEEL_RENDER_MODE == 'raster':
+                    frame = render_wheel_frame(positions, angle, labels)
+                else:
+                    fig = borrowed.enter_context(figure_pool.wheel(positions, angle, labels))
+            with profiler.span('wheel.encode', mode=WHEEL_RENDER_MODE, scale=scale):
+                if WHEEL_RENDER_MODE == 'raster':
+                    return encode_wheel_frame(frame, reduce=round(1 / scale))
+                return encode_figure(fig, dpi)
     
-    # Vẽ hình nền (đổ bóng)
-    shadow_circle = Circle((0.02, -0.02), 0.95, fc='#00000022', zorder=0)
-    ax.add_patch(shadow_circle)
-    
-    # Vẽ viền ngoài vòng quay
-    outer_circle = Circle((0, 0), 0.95, fc='none', ec='#333333', lw=2, zorder=1)
-    ax.add_patch(outer_circle)
-    
-    for i in range(n):
-        # Thêm hiệu ứng 3D với độ sáng khác nhau cho các phần
-        base_color = colors[i]
-        
-        # Tạo wedge chính
-        wedge = Wedge((0, 0), 0.92, theta1, theta1 + theta2, fc=base_color, ec='white', lw=1, zorder=2)
-        ax.add_patch(wedge)
-        wedges.append(wedge)
-        
-        # Thêm nhãn
-        mid_angle = np.radians((theta1 + theta1 + theta2) / 2)
-        text_radius = 0.6  # Đặt nhãn gần tâm hơn một chút để dễ đọc
-        text_x = text_radius * np.cos(mid_angle)
-        text_y = text_radius * np.sin(mid_angle)
-        
-        # Thay thế patheffects bằng cách vẽ text hai lần - đầu tiên là đường viền đen, sau đó là text trắng
-        # Vẽ đường viền đen
-        for dx, dy in [(-0.005, 0), (0.005, 0), (0, -0.005), (0, 0.005), 
-                       (-0.005, -0.005), (-0.005, 0.005), (0.005, -0.005), (0.005, 0.005)]:
-            ax.text(text_x + dx, text_y + dy, positions[i], ha='center', va='center', 
-                    fontsize=14, fontweight='bold', color='black')
-        
-        # Vẽ text chính màu trắng
-        ax.text(text_x, text_y, positions[i], ha='center', va='center', 
-                fontsize=14, fontweight='bold', color='white')
-        
-        # Lưu vị trí của nhãn để xác định kết quả
-        labels_pos.append((mid_angle, positions[i]))
-        
-        theta1 += theta2
-    
-    # Thêm vòng tròn ở giữa
-    inner_circle_bg = Circle((0, 0), 0.27, fc='#333333', ec='#555555', lw=4, zorder=5)
-    ax.add_patch(inner_circle_bg)
-    
-    center_circle = Circle((0, 0), 0.25, fc='#444444', ec='#666666', lw=2, zorder=6)
-    ax.add_patch(center_circle)
-    
-    # Logo hoặc văn bản ở giữa - sử dụng kỹ thuật tương tự để tạo hiệu ứng đường viền
-    # Vẽ đường viền đen
-    for dx, dy in [(-0.01, 0), (0.01, 0), (0, -0.01), (0, 0.01), 
-                 (-0.01, -0.01), (-0.01, 0.01), (0.01, -0.01), (0.01, 0.01)]:
-        ax.text(0 + dx, 0 + dy, "RSC", ha='center', va='center', fontsize=30, 
-                fontweight='bold', color='black', zorder=7)
-                
-    # Vẽ text trắng ở giữa
-    ax.text(0, 0, "RSC", ha='center', va='center', fontsize=30, 
-            fontweight='bold', color='white', zorder=8)
-    
-    # Thêm mũi tên chỉ vị trí (ở trên cùng với hiệu ứng đẹp hơn)
-    arrow_height = 0.15
-    arrow_width = 0.08
-    arrow_x = 0
-    arrow_y = 0.92
-    
-    # Tạo hình mũi tên
-    arrow_shape = np.array([[arrow_x, arrow_y], 
-                           [arrow_x - arrow_width/2, arrow_y + arrow_height/2], 
-                           [arrow_x, arrow_y - arrow_height/2],
-                           [arrow_x + arrow_width/2, arrow_y + arrow_height/2]])
-    
-    arrow = Polygon(arrow_shape, fc='red', ec='darkred', lw=1, zorder=10)
-    ax.add_patch(arrow)
-    
-    # Thêm viền ngoài để thêm hiệu ứng đổ bóng
-    highlight_circle = Circle((0, 0), 0.97, fc='none', ec='#FFFFFF55', lw=3, zorder=1)
-    ax.add_patch(highlight_circle)
-    
-    ax.set_xlim(-1, 1)
-    ax.set_ylim(-1, 1)
-    ax.set_aspect('equal')
-    ax.axis('off')
-    
-    # Đặt màu nền trong suốt
-    fig.patch.set_alpha(0.0)
-    
-    return fig, labels_pos
+    return frame_cache.get((WHEEL_RENDER_MODE, tuple(positions), angle, dpi, labels), build)
+
+# Hiển thị vòng quay vào container
+def show_wheel(container, positions, angle=0, scale=1.0, labels=True):
+    with profiler.span('wheel'):
+        image = wheel_png(positions, angle, scale, labels)
+    with profiler.span('wheel.send', bytes=len(image)):
+        container.image(image, use_column_width=True)
+
+# Làm nóng một lần cho mỗi tiến trình / Once-per-process warm-up
+# Dựng trước âm thanh, font nhúng, đường nét chữ của nhãn cho mọi số phần tử còn lại và ảnh vòng quay tĩnh
+# mà người xem đầu tiên của từng giải sẽ thấy (theo nhật ký nếu có). Chạy serve.py thì bước này xong trước khi có phiên nào.
+@st.cache_resource(show_spinner=False)
+def get_warm_up():
+    steps = engine_steps([t.positions() for t in TOURNAMENTS.values()], glyphs=WHEEL_RENDER_MODE in ('figure', 'raster'))
+    for warm_id, warm_tournament in TOURNAMENTS.items():
+        idle = draw_journal.fresh_state(warm_tournament)
+        if DRAW_JOURNAL_PATH:
+            draw_journal.restore(idle, get_journal(tournament_journal_path(warm_id)).draws(), warm_tournament)
+        if WHEEL_RENDER_MODE != 'client':
+            steps.append((f'wheel[{warm_id}]', lambda idle=idle: wheel_png(idle.available_positions, idle.wheel_angle)))
+    timings = warm_up(steps)
+    get_logger(__name__).info("Warm-up (%s): %s", WHEEL_RENDER_MODE,
+                              ", ".join(f"{name} {ms:.0f} ms" for name, ms in timings.items()))
+    return timings
+
+warm_up_timings = get_warm_up()
+
+# Lượt quay thường luôn phát khung dừng và đuôi nảy; lượt quay rút gọn (bounce=0) chỉ giữ khung dừng
+SPIN_KEEP_TAIL = bounce_frame_count() + 1
 
-# Hàm xác định vị trí được chọn dựa trên góc quay
-def get_selected_position(labels_pos, angle):
-    # Chuyển đổi góc quay sang radian
-    angle_rad = np.radians(angle)
+# Phát lại các khung hình của một lượt quay trên máy chủ theo mức chi tiết của từng khung hình
+# Nếu có lượt quay đã vẽ trước thì chỉ hiển thị ảnh đã mã hóa sẵn. Bộ lập lịch giữ đúng thời lượng
+# SERVER_SPIN_SECONDS, bỏ bớt khung hình khi bị trễ (trừ keep_tail khung cuối); trả về fps đạt được và số khung hình bị bỏ
+def play_spin(container, positions, angles, details, prerendered=None, duration=SERVER_SPIN_SECONDS, progress_bar=None,
+              keep_tail=1):
+    progress_bar = progress_bar or st.progress(0)
+    scheduler = FrameScheduler(len(angles), duration, keep_tail=keep_tail)
+    for i in scheduler:
+        with profiler.span('spin.frame', index=i):
+            if prerendered:
+                with profiler.span('spin.wait', index=i):
+                    image = prerendered.frame(i)
+                with profiler.span('wheel.send', bytes=len(image)):
+                    container.image(image, use_column_width=True)
+            else:
+                show_wheel(container, positions, angles[i], *details[i])
+            progress_bar.progress(int((i + 1) / len(angles) * 100))
     
-    # Điều chỉnh góc để phù hợp với hệ tọa độ của matplotlib
-    adjusted_angle = (angle_rad - np.pi/2) % (2*np.pi)
+    stats = scheduler.stats()
+    profiler.record('spin', stats['duration'] * 1000, fps=stats['fps'], dropped=stats['dropped'])
+    return stats
+
+# Lượt quay tiếp theo: dùng kế hoạch đã vẽ trước nếu vòng quay chưa đổi và vị trí đích hợp lệ
+# với đội vừa chọn, nếu không thì tính ngay (các khung hình vẫn được vẽ ở luồng nền song song với lúc phát).
+# Đích được rút đều trên mọi vị trí và chỉ nhận khi hợp lệ (rút lại seed nếu không), nên kết quả vẫn đều
+# trên các vị trí hợp lệ và lượt quay chỉ phụ thuộc seed - nhật ký phát lại được mà không cần biết luật.
+def take_next_spin():
+    allowed = [draw.available_positions[i] for i in draw_state.allowed_indices(draw, draw.current_team, DRAW_RULES, all_teams)]
+    next_spin = st.session_state.pop('next_spin', None)
+    if next_spin:
+        prerender_budget.discard(next_spin)  # Đang phát thì không được giải phóng
+    if next_spin and next_spin.matches(draw) and next_spin.position in allowed:
+        return next_spin
+    if next_spin:
+        next_spin.cancel()
     
-    # Tìm vị trí gần nhất với mũi tên (trên cùng)
-    arrow_angle = 0  # Vì đã điều chỉnh góc
+    seed = draw_state.new_seed()
+    while draw_state.plan_spin(draw, seed, n_frames=1, bounce=0)[0] not in allowed:
+        seed = draw_state.new_seed()
+    return prerender_spin(get_prerender_pool(), wheel_png, draw, seed, n_frames=SPIN_FRAMES)
+
+# Lượt quay trên máy chủ đang chờ mà không còn ai phát: chính phiên này đã công bố nó (lần chạy trước bị
+# ngắt, vì một phiên chỉ chạy một lần tại một thời điểm) hoặc đã quá hạn (người điều khiển khác mất kết nối)
+def spin_orphaned(spin):
+    return spin.get('owner') == session_token or time.time() > spin.get('deadline', float('inf'))
+
+# Ghi nhận lượt quay đã công bố theo kế hoạch của nó (đội, vị trí, góc cuối); False nếu phiên khác đã ghi nhận
+def finish_spin(spin):
+    with shared_update():
+        if (draw.pending_spin or {}).get('id') != spin['id']:
+            return False
+        draw_state.commit_draw(draw, spin['team'], spin['position'], spin['angles'][-1])
+        draw.spinning = False
+        draw.last_result = spin
+        journal_draw(spin, spin['angles'][-1])
+        draw.pending_spin = None
+    return True
+
+# Ghi một kết quả của lượt bốc thăm chung vào nhật ký (nếu có); spin là lượt quay đang chờ (đội, vị trí, seed, góc bắt đầu)
+def journal_draw(spin, final_angle, targeted=False):
+    if journal and hub:
+        journal.record_draw(spin['team'], spin['position'], final_angle, spin.get('seed'), spin.get('start_angle'), targeted)
+
+# Tạo HTML cho bảng kết quả song ngữ
+# Cả bảng được lưu theo (ngôn ngữ, ảnh chụp bảng kết quả); khi có đội mới chỉ ô đổi và hàng chứa nó
+# được dựng lại, tiêu đề và các hàng khác lấy từ cache
+def results_table_html(result_table):
+    language = st.session_state.language
+    snapshot = tuple((group, tuple(slots)) for group, slots in result_table.items())
+    return html_cache.get(('table', language, snapshot), lambda: build_results_table(language, snapshot))
+
+def build_results_table(language, snapshot):
+    groups = tuple(group for group, _ in snapshot)
+    table_html = html_cache.get(('table.head', language, groups), lambda: results_table_head(language, groups))
     
-    # Tìm vị trí có góc gần với mũi tên nhất
-    min_diff = float('inf')
-    selected_position = None
+    # Mỗi hàng là một vị trí, mỗi cột là một bảng
+    rows = max((len(slots) for _, slots in snapshot), default=0)
+    for i in range(rows):
+        values = tuple(slots[i] if i < len(slots) else None for _, slots in snapshot)
+        table_html += html_cache.get(('table.row', i, values), lambda: results_table_row(i, values))
     
-    for pos_angle, position in labels_pos:
-        # Điều chỉnh góc của vị trí
-        adjusted_pos_angle = (pos_angle - np.pi/2) % (2*np.pi)
-        
-        # Tính khoảng cách góc
-        diff = min((adjusted_pos_angle - arrow_angle) % (2*np.pi), 
-                   (arrow_angle - adjusted_pos_angle) % (2*np.pi))
-        
-        if diff < min_diff:
-            min_diff = diff
-            selected_position = position
+    return table_html + '</tbody></table>'
+
+# Tiêu đề cột song ngữ
+def results_table_head(language, groups):
+    if language == 'vi':
+        position_text = f"{get_text('position')} / Position"
+        group_texts = [f"{get_text('group', group=group)} / Group {group}" for group in groups]
+    else:
+        position_text = f"Position / {get_text('position')}"
+        group_texts = [f"Group {group} / {get_text('group', group=group)}" for group in groups]
     
-    return selected_position
+    return ('<table class="styled-table"><thead><tr>' + f'<th>{position_text}</th>'
+            + ''.join(f'<th>{group_text}</th>' for group_text in group_texts) + '</tr></thead><tbody>')
 
-# Hàm cập nhật bảng kết quả
-def update_result_table(position, team):
-    group = position[0]  # Lấy chữ cái đầu (A, B)
-    index = int(position[1:]) - 1  # Lấy số (0-based index)
-    st.session_state.result_table[group][index] = team
+# Một hàng của bảng: số thứ tự vị trí rồi đội ở vị trí đó của từng bảng
+def results_table_row(i, values):
+    return (f'<tr><td class="header-cell">{i+1}</td>'
+            + ''.join(html_cache.get(('table.cell', value), lambda: results_table_cell(value)) for value in values) + '</tr>')
+
+def results_table_cell(value):
+    if value is None or value == "":
+        return '<td class="empty-cell">_____</td>'
+    return f'<td class="">{value}</td>'
 
 # Hàm tạo HTML để phát âm thanh
 def autoplay_audio(url):
     audio_html = f"""
         <audio id="wheelAudio" autoplay loop>
-            <source src="{url}" type="audio/ogg">
+            <source src="{url}">
             Your browser does not support the audio element.
         </audio>
         <script>
@@ -288,7 +464,7 @@ def autoplay_audio(url):
 def play_result_audio():
     result_html = f"""
         <audio id="resultAudio" autoplay>
-            <source src="https://www.soundjay.com/buttons/sounds/button-09.mp3" type="audio/mpeg">
+            <source src="{audio_uri('result')}">
             Your browser does not support the audio element.
         </audio>
     """
@@ -310,17 +486,15 @@ def stop_audio():
 # CSS để tạo giao diện đẹp mắt
 css = """
 <style>
-    /* Thiết lập toàn trang */
-    @import url('https://fonts.googleapis.com/css2?family=Montserrat:wght@400;500;700&display=swap');
-
+    /* Thiết lập toàn trang: Montserrat (xem draw_engine/assets.py), font hệ thống khi không nạp được */
     .main {
         background: linear-gradient(135deg, #f0f2f5, #e6e9ef);
-        font-family: 'Montserrat', sans-serif;
+        font-family: 'Montserrat', 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
     }
     
     h1, h2, h3 {
         color: #1a3a5f;
-        font-family: 'Montserrat', sans-serif;
+        font-family: 'Montserrat', 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
         font-weight: 700;
     }
     
@@ -383,7 +557,7 @@ css = """
         border-collapse: collapse;
         margin: 25px 0;
         font-size: 18px;
-        font-family: 'Montserrat', sans-serif;
+        font-family: 'Montserrat', 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
         box-shadow: 0 0 30px rgba(0, 0, 0, 0.15);
         border-radius: 10px;
         overflow: hidden;
@@ -511,11 +685,8 @@ css = """
 """
 
 # Hiển thị CSS
-st.markdown(css, unsafe_allow_html=True)
-
-# Placeholder cho audio
-audio_placeholder = st.empty()
-result_audio_placeholder = st.empty()
+with profiler.span('css'):
+    st.markdown(html_cache.get(('css',), lambda: font_face_css() + css), unsafe_allow_html=True)
 
 # Chọn ngôn ngữ / Language selector
 lang_col1, lang_col2 = st.columns([6, 1])
@@ -531,190 +702,385 @@ with lang_col2:
         st.rerun()
 
 # Tiêu đề ứng dụng với lớp CSS
-st.markdown(f'<div class="title-container"><h1>{get_text("title")}</h1></div>', unsafe_allow_html=True)
-
-# Container 1: Phần droplist và button (trên)
-with st.container():
-    st.markdown('<div class="draw-container">', unsafe_allow_html=True)
-    st.header(get_text('draw_header'))
-    
-    # Hiển thị số đội còn lại cần bốc thăm
-    st.subheader(get_text('teams_left', count=len(available_teams)))
-    
-    # Chia cột cho phần điều khiển
-    control_col1, control_col2, control_col3 = st.columns([2, 1, 1])
-    
-    with control_col1:
-        if available_teams:
-            # Dropdown để chọn đội
-            selected_team = st.selectbox(get_text('select_team'), available_teams)
-        else:
-            st.markdown(f'<div class="completed-message">{get_text("all_teams_drawn")}</div>', unsafe_allow_html=True)
-            selected_team = None
-    
-    with control_col2:
-        # Nút bốc thăm
-        if available_teams and st.button(get_text('draw_button'), use_container_width=True):
-            st.session_state.spinning = True
-            st.session_state.current_team = selected_team
-            st.session_state.used_teams.append(selected_team)
-            st.rerun()
+title = (tournament.title or {}).get(st.session_state.language) or get_text("title")
+st.markdown(f'<div class="title-container"><h1>{title}</h1></div>', unsafe_allow_html=True)
+
+# Bấm Bốc thăm: ghi nhận đội và bắt đầu lượt quay, chạy ngay trước khi khu vực bốc thăm vẽ lại
+# Kiểm tra và đặt spinning trong cùng một lần khóa: nút bấm từ một tab cũ (hoặc tab điều khiển thứ hai
+# khi trình chiếu chung) trong lúc đang quay, hay với đội đã được bốc, không làm gì cả
+def start_draw(team):
+    with shared_update():
+        if draw.spinning or team in draw.used_teams:
+            return
+        draw.spinning = True
+        draw.current_team = team
+        draw.used_teams.append(team)
+
+# Bấm Bốc thăm tất cả: gán toàn bộ đội còn lại trong một lần cập nhật trạng thái.
+# Ở chế độ vẽ trên máy chủ, các lượt quay được vẽ trước ở nền để phát một hoạt ảnh rút gọn;
+# chế độ client gán ngay vì component không đổi được các ô giữa một lượt quay.
+# Nút bấm từ một tab cũ trong lúc đang có lượt quay dở không làm gì: lượt quay đó vẫn giữ vị trí của nó.
+def draw_all():
+    with shared_update():
+        if draw.spinning or draw.pending_spin:
+            return
+        spins = draw_state.draw_remaining(draw, all_teams, rules=DRAW_RULES, n_frames=BATCH_SPIN_FRAMES,
+                                          bounce=0, wrap=False)
+        draw.last_result = None
+        for spin in spins:
+            journal_draw(spin, spin['angles'][-1], targeted=True)
+    
+    if WHEEL_RENDER_MODE != 'client' and broadcast_role != 'viewer' and BATCH_SPIN_SECONDS and len(spins) <= BATCH_MAX_SPINS:
+        pool = get_prerender_pool()
+        st.session_state.batch_spins = [
+            dict(spin, frames=prerender_trajectory(pool, wheel_png, spin['positions'], spin['start_angle'],
+                                                   spin['position'], spin['angles']))
+            for spin in spins
+        ]
+
+# ?replay=1: phát lại lượt bốc thăm trong nhật ký từ đầu, mỗi lượt quay tính lại từ seed đã ghi
+# (chế độ client chỉ tua nhanh tới kết quả cuối)
+if journal and st.query_params.get('replay') == '1' and not broadcast_role and 'replayed' not in st.session_state:
+    st.session_state.replayed = True
+    draws = journal.draws()
+    replay = draw_journal.replay_spins(draws, tournament, DRAW_RULES, all_teams, n_frames=SPIN_FRAMES, wrap=False)
+    draw_journal.restore(draw, draws, tournament)
+    if WHEEL_RENDER_MODE != 'client':
+        pool = get_prerender_pool()
+        st.session_state.batch_spins = [
+            dict(spin, duration=SERVER_SPIN_SECONDS, keep_tail=SPIN_KEEP_TAIL,
+                 frames=prerender_trajectory(pool, wheel_png, spin['positions'], spin['start_angle'],
+                                             spin['position'], spin['angles']))
+            for spin in replay
+        ]
+
+# Khu vực bốc thăm (điều khiển, vòng quay, bảng kết quả) là một fragment: bấm Bốc thăm hay chọn đội
+# chỉ chạy lại phần này, CSS, bộ chọn ngôn ngữ và tiêu đề không phải dựng và gửi lại.
+# Streamlit < 1.33 không có fragment nên vẫn chạy lại cả trang như trước.
+fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda func: func)
+
+@fragment
+def draw_area():
+    global profiler
+    if page_rendered:
+        # Chỉ fragment chạy lại: đo riêng lần chạy này
+        profiler = Profiler()
+    
+    # Placeholder cho audio
+    audio_placeholder = st.empty()
+    result_audio_placeholder = st.empty()
+    
+    # Lọc các đội đã được bốc thăm
+    available_teams = draw_state.available_teams(draw, all_teams)
+    
+    # Container 1: Phần droplist và button (trên) - khán giả chỉ xem nên không có phần điều khiển
+    if broadcast_role != 'viewer':
+        with st.container():
+            st.markdown('<div class="draw-container">', unsafe_allow_html=True)
+            st.header(get_text('draw_header'))
+            
+            # Hiển thị số đội còn lại cần bốc thăm
+            st.subheader(get_text('teams_left', count=len(available_teams), total=len(all_teams)))
+            
+            # Chia cột cho phần điều khiển
+            control_col1, control_col2, control_col3, control_col4 = st.columns([2, 1, 1, 1])
+            
+            with control_col1:
+                if available_teams:
+                    # Dropdown để chọn đội
+                    selected_team = st.selectbox(get_text('select_team'), available_teams)
+                else:
+                    st.markdown(banner_html('completed-message', 'all_teams_drawn'), unsafe_allow_html=True)
+                    selected_team = None
+            
+            with control_col2:
+                # Nút bốc thăm
+                if available_teams:
+                    st.button(get_text('draw_button'), use_container_width=True, disabled=draw.spinning,
+                              on_click=start_draw, args=(selected_team,))
+            
+            with control_col3:
+                # Nút bốc thăm tất cả các đội còn lại (tập dượt nhanh)
+                if available_teams:
+                    st.button(get_text('draw_all_button'), use_container_width=True, disabled=draw.spinning,
+                              on_click=draw_all)
+                    
+            with control_col4:
+                # Nút reset
+                if st.button(get_text('reset_button'), use_container_width=True, key="reset_button"):
+                    if journal and hub:
+                        journal.record_reset()
+                    if hub:
+                        hub.reset()
+                    else:
+                        for key in list(st.session_state.keys()):
+                            if key != 'language':  # Giữ nguyên ngôn ngữ đã chọn
+                                del st.session_state[key]
+                    st.rerun()  # Chạy lại cả trang vì trạng thái được khởi tạo lại từ đầu
             
-    with control_col3:
-        # Nút reset
-        if st.button(get_text('reset_button'), use_container_width=True, key="reset_button"):
-            for key in list(st.session_state.keys()):
-                if key != 'language':  # Giữ nguyên ngôn ngữ đã chọn
-                    del st.session_state[key]
-            st.rerun()
-    
-    st.markdown('</div>', unsafe_allow_html=True)
-
-# Container 2: Vòng xoay và kết quả bốc thăm (dưới)
-with st.container():
-    st.markdown('<div class="draw-container">', unsafe_allow_html=True)
-    
-    # Chia cột cho vòng xoay và kết quả
-    wheel_col, results_col = st.columns([2, 5])
-    
-    # Cột 1: Vòng xoay
-    with wheel_col:
-        st.markdown('<div class="wheel-container">', unsafe_allow_html=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+
+    # Container 2: Vòng xoay và kết quả bốc thăm (dưới)
+    with st.container():
+        st.markdown('<div class="draw-container">', unsafe_allow_html=True)
         
-        # Hiển thị vòng quay may mắn
-        wheel_container = st.empty()
-        result_container = st.empty()
+        # Chia cột cho vòng xoay và kết quả
+        wheel_col, results_col = st.columns([2, 5])
         
-        if st.session_state.spinning and st.session_state.available_positions:
-            audio_url = "https://tiengdong.com/wp-content/uploads/Am-thanh-vong-quay-chiec-non-ky-dieu-www_tiengdong_com.mp3?_=1"
-            audio_placeholder.markdown(autoplay_audio(audio_url), unsafe_allow_html=True)
+        # Cột 1: Vòng xoay
+        with wheel_col:
+            st.markdown('<div class="wheel-container">', unsafe_allow_html=True)
             
-            with st.spinner(get_text('spinning')):
-                progress_bar = st.progress(0)
-                
-                # Điều chỉnh tham số quay
-                total_spins = 10  # Tăng số khung hình
-                spin_duration = 0.2  # Thời gian quay 5 giây
-                
-                n = len(st.session_state.available_positions)
-                segment_angle = 360 / n
-                
-                random_index = random.randint(0, n - 1)
-                target_angle = random_index * segment_angle + segment_angle / 2
-                target_angle += random.randint(15, 25) * 360  # Thêm nhiều vòng quay hơn
+            # Hiển thị vòng quay may mắn
+            wheel_container = st.empty()
+            result_container = st.empty()
+            
+            audio_url = audio_uri('spin')
+            just_finished = None
+            spun = False  # Đã phát khung hình quay trên máy chủ trong lần chạy này
+            
+            if broadcast_role == 'viewer':
+                # Khán giả: phát lại lượt quay đang diễn ra từ trạng thái chung
+                pending_spin = draw.pending_spin
+                if pending_spin:
+                    audio_placeholder.markdown(autoplay_audio(audio_url), unsafe_allow_html=True)
+                if WHEEL_RENDER_MODE != 'client' and pending_spin and time.time() < pending_spin.get('deadline', float('inf')):
+                    st.session_state.spin_stats = play_spin(wheel_container, pending_spin['positions'],
+                                                            pending_spin['angles'], pending_spin['details'],
+                                                            keep_tail=SPIN_KEEP_TAIL)
+                    spun = True
                 
-                angles = []
-                current_angle = st.session_state.wheel_angle
+                # Phát âm thanh kết quả một lần cho mỗi kết quả mới
+                if draw.last_result and not pending_spin:
+                    if st.session_state.get('heard_result') != draw.last_result['id']:
+                        st.session_state.heard_result = draw.last_result['id']
+                        result_audio_placeholder.markdown(play_result_audio(), unsafe_allow_html=True)
+                    just_finished = draw.last_result
+            elif WHEEL_RENDER_MODE == 'client':
+                # Trình duyệt tự quay; máy chủ chỉ tính kết quả và chờ component báo quay xong
+                pending_spin = draw.pending_spin
+                spin_done = st.session_state.get('spin_wheel')
                 
-                # Tạo hiệu ứng quay cải tiến
-                for i in range(total_spins):
-                    progress = i / total_spins
-                    t = easeInOutCirc(progress)
+                if pending_spin and spin_done and spin_done.get('id') == pending_spin['id']:
+                    # Ghi nhận một lần dù nhiều tab điều khiển cùng báo quay xong. Vị trí đã bị chiếm trong lúc quay
+                    # thì bỏ lượt quay và trả đội về danh sách chờ thay vì để lỗi lặp lại ở mọi lần chạy lại
+                    committed = False
+                    with shared_update():
+                        if (draw.pending_spin or {}).get('id') == pending_spin['id']:
+                            draw.spinning = False
+                            draw.pending_spin = None
+                            try:
+                                draw_state.commit_draw(draw, pending_spin['team'], pending_spin['position'], pending_spin['end'])
+                            except ValueError:
+                                if pending_spin['team'] not in draw.results:
+                                    draw.used_teams.remove(pending_spin['team'])
+                            else:
+                                draw.last_result = pending_spin
+                                journal_draw(pending_spin, pending_spin['end'], targeted=True)
+                                committed = True
                     
-                    # Điều chỉnh các giai đoạn quay
-                    if progress < 0.25:
-                        current_angle += (target_angle - current_angle) * 0.04 * (1 + progress * 8)
-                    elif progress < 0.7:
-                        current_angle += (target_angle - current_angle) * 0.04 * 2.5
-                    else:
-                        current_angle += (target_angle - current_angle) * 0.04 * (1 + (1 - progress) * 6)
+                    audio_placeholder.markdown(stop_audio(), unsafe_allow_html=True)
+                    if committed:
+                        just_finished = pending_spin
+                        result_audio_placeholder.markdown(play_result_audio(), unsafe_allow_html=True)
+                elif draw.spinning and draw.available_positions and not pending_spin:
+                    start_angle = draw.wheel_angle
                     
-                    # Thêm nhiễu ngẫu nhiên
-                    if i < total_spins * 0.9:
-                        current_angle += random.uniform(-0.5, 0.5)
+                    # Quỹ đạo liên tục (chưa chia dư) để trình duyệt nội suy, không nhiễu và không nảy
+                    # vì component tự thêm hiệu ứng nảy khi dừng
+                    seed = draw_state.new_seed()
+                    position, keyframes = draw_state.plan_spin(draw, seed, team=draw.current_team, rules=DRAW_RULES,
+                                                               teams=all_teams, n_frames=SPIN_SECONDS * SPIN_FPS,
+                                                               jitter=0, bounce=0, wrap=False)
                     
-                    angles.append(current_angle % 360)
-                
-                # Thêm hiệu ứng nảy khi dừng
-                final_angle = angles[-1]
-                for j in range(3):
-                    angles.append((final_angle + (1 if j % 2 else -1) * (j + 1) * 0.3) % 360)
-                angles.append(final_angle % 360)
-                
-                # Thực hiện quay
-                labels_pos = None
-                for i, angle in enumerate(angles):
-                    fig, labels_pos = create_wheel(st.session_state.available_positions, angle)
-                    wheel_container.pyplot(fig)
-                    progress_bar.progress(int((i + 1) / len(angles) * 100))
-                    time.sleep(spin_duration / len(angles))
-                
-                # Lưu góc quay cuối cùng
-                st.session_state.wheel_angle = angles[-1] % 360
-                
-                # Xác định vị trí được chọn dựa trên góc quay cuối cùng
-                selected_position = get_selected_position(labels_pos, st.session_state.wheel_angle)
-                
-                # Lưu kết quả
-                st.session_state.results[st.session_state.current_team] = selected_position
-                st.session_state.available_positions.remove(selected_position)
-                
-                # Cập nhật bảng kết quả
-                update_result_table(selected_position, st.session_state.current_team)
+                    with shared_update():
+                        if draw.pending_spin is None:  # Tab điều khiển khác có thể vừa công bố lượt quay
+                            draw.pending_spin = {
+                                'id': uuid.uuid4().hex,
+                                'team': draw.current_team,
+                                'position': position,
+                                'keyframes': [round(start_angle, 3)] + np.round(keyframes, 3).tolist(),
+                                'end': float(keyframes[-1]),
+                                'started': time.time(),
+                                'seed': seed,
+                                'start_angle': start_angle,
+                            }
+                    audio_placeholder.markdown(autoplay_audio(audio_url), unsafe_allow_html=True)
+            elif st.session_state.get('batch_spins'):
+                # Hoạt ảnh rút gọn của lượt bốc thăm tất cả, hoặc phát lại nhật ký (kết quả đã được ghi nhận)
+                audio_placeholder.markdown(autoplay_audio(audio_url), unsafe_allow_html=True)
+                progress_bar = st.progress(0)
+                for spin in st.session_state.pop('batch_spins'):
+                    frames = spin['frames']
+                    play_spin(wheel_container, frames.positions, frames.angles, frames.details, frames,
+                              duration=spin.get('duration', BATCH_SPIN_SECONDS), progress_bar=progress_bar,
+                              keep_tail=spin.get('keep_tail', 1))
+                    result_html = banner_html('highlight-result', 'result', team=spin['team'], position=spin['position'])
+                    result_container.markdown(result_html, unsafe_allow_html=True)
+                spun = True
                 
-                # Dừng âm thanh quay và phát âm thanh kết quả
                 audio_placeholder.markdown(stop_audio(), unsafe_allow_html=True)
                 result_audio_placeholder.markdown(play_result_audio(), unsafe_allow_html=True)
+            elif draw.spinning and draw.available_positions and draw.pending_spin and spin_orphaned(draw.pending_spin):
+                # Lượt quay bị ngắt giữa chừng (đổi ngôn ngữ chạy lại cả trang, người điều khiển mất kết nối):
+                # vị trí và quỹ đạo đã có trong kế hoạch đã công bố nên ghi nhận luôn, không quay lại
+                spin = draw.pending_spin
+                if finish_spin(spin):
+                    just_finished = spin
+                    result_audio_placeholder.markdown(play_result_audio(), unsafe_allow_html=True)
+            elif draw.spinning and draw.available_positions and not draw.pending_spin:
+                audio_placeholder.markdown(autoplay_audio(audio_url), unsafe_allow_html=True)
                 
+                with st.spinner(get_text('spinning')):
+                    next_spin = take_next_spin()
+                    positions = list(next_spin.positions)
+                    result_position, angles = next_spin.position, next_spin.angles
+                    
+                    # Công bố lượt quay để khán giả phát lại cùng các khung hình. Chỉ phiên công bố được
+                    # mới quay: tab điều khiển khác chạy lại cùng lúc thấy đã có lượt quay và chỉ hiện vòng quay tĩnh
+                    with shared_update():
+                        claimed = draw.pending_spin is None
+                        if claimed:
+                            draw.pending_spin = {
+                                'id': uuid.uuid4().hex,
+                                'team': draw.current_team,
+                                'position': result_position,
+                                'positions': positions,
+                                'angles': angles.tolist(),
+                                'details': next_spin.details,
+                                'seed': next_spin.seed,
+                                'start_angle': next_spin.start_angle,
+                                'owner': session_token,
+                                'deadline': time.time() + SPIN_DEADLINE_SECONDS,
+                            }
+                    
+                    if claimed:
+                        # Thực hiện quay
+                        spin = draw.pending_spin
+                        st.session_state.spin_stats = play_spin(wheel_container, positions, angles, next_spin.details, next_spin,
+                                                                keep_tail=SPIN_KEEP_TAIL)
+                        spun = True
+                        
+                        # Ghi nhận vị trí nằm dưới mũi tên ở góc quay cuối cùng cho đội của lượt quay đã công bố
+                        if finish_spin(spin):
+                            just_finished = spin
+                        
+                        # Dừng âm thanh quay và phát âm thanh kết quả
+                        audio_placeholder.markdown(stop_audio(), unsafe_allow_html=True)
+                        result_audio_placeholder.markdown(play_result_audio(), unsafe_allow_html=True)
+                    else:
+                        next_spin.cancel()
+                        audio_placeholder.empty()
+            
+            if just_finished:
                 # Hiển thị kết quả với hiệu ứng
-                result_html = f'<div class="highlight-result">{get_text("result", team=st.session_state.current_team, position=selected_position)}</div>'
+                result_html = banner_html('highlight-result', 'result', team=just_finished['team'], position=just_finished['position'])
                 result_container.markdown(result_html, unsafe_allow_html=True)
+            
+            if draw.available_positions:
+                if WHEEL_RENDER_MODE == 'client':
+                    pending_spin = draw.pending_spin
+                    spin = None
+                    if pending_spin:
+                        # offset: khán giả vào giữa chừng sẽ xem tiếp từ thời điểm hiện tại của lượt quay
+                        spin = dict(pending_spin, duration=SPIN_SECONDS, offset=time.time() - pending_spin['started'])
+                    with wheel_container:
+                        spin_wheel(
+                            positions=draw.available_positions,
+                            colors=WHEEL_COLORS,
+                            label_size=label_size(len(draw.available_positions)),
+                            label_stride=label_stride(len(draw.available_positions)),
+                            angle=draw.wheel_angle,
+                            spin=spin,
+                            key='spin_wheel',
+                            default=None,
+                        )
+                elif not spun:
+                    # Hiển thị vòng quay tĩnh
+                    show_wheel(wheel_container, draw.available_positions, draw.wheel_angle)
                 
-                st.session_state.spinning = False
-        else:
-            # Hiển thị vòng quay tĩnh
-            if st.session_state.available_positions:
-                fig, _ = create_wheel(st.session_state.available_positions, st.session_state.wheel_angle)
-                wheel_container.pyplot(fig)
-        
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    # Cột 2: Kết quả bốc thăm
-    with results_col:
-        st.header(get_text('results_header'))
-        
-        # Tạo HTML cho bảng song ngữ
-        table_html = '<table class="styled-table"><thead><tr>'
-        
-        # Tiêu đề cột song ngữ
-        if st.session_state.language == 'vi':
-            position_text = f"{get_text('position')} / Position"
-        else:
-            position_text = f"Position / {get_text('position')}"
-        
-        table_html += f'<th>{position_text}</th>'
-        
-        for group in ['A', 'B']:
-            if st.session_state.language == 'vi':
-                group_text = f"{get_text('group', group=group)} / Group {group}"
-            else:
-                group_text = f"Group {group} / {get_text('group', group=group)}"
-            table_html += f'<th>{group_text}</th>'
-        
-        table_html += '</tr></thead><tbody>'
-        
-        # Thêm dữ liệu vào bảng
-        for i in range(4):
-            table_html += '<tr>'
-            table_html += f'<td class="header-cell">{i+1}</td>'
+                # Vẽ trước lượt quay tiếp theo ở nền trong lúc người điều khiển chọn đội
+                if WHEEL_RENDER_MODE != 'client' and broadcast_role != 'viewer' and not draw.spinning:
+                    next_spin = st.session_state.get('next_spin')
+                    if not (next_spin and next_spin.matches(draw)):
+                        if next_spin:
+                            next_spin.cancel()
+                        st.session_state.next_spin = prerender_budget.add(
+                            prerender_spin(get_prerender_pool(), wheel_png, draw, n_frames=SPIN_FRAMES))
             
-            # Bảng A
-            cell_value = st.session_state.result_table['A'][i] if i < len(st.session_state.result_table['A']) and st.session_state.result_table['A'][i] is not None else ""
-            cell_class = "empty-cell" if cell_value == "" else ""
-            cell_content = cell_value if cell_value != "" else "_____"
-            table_html += f'<td class="{cell_class}">{cell_content}</td>'
+            st.markdown('</div>', unsafe_allow_html=True)
+        
+        # Cột 2: Kết quả bốc thăm
+        with results_col:
+            st.header(get_text('results_header'))
             
-            # Bảng B
-            cell_value = st.session_state.result_table['B'][i] if i < len(st.session_state.result_table['B']) and st.session_state.result_table['B'][i] is not None else ""
-            cell_class = "empty-cell" if cell_value == "" else ""
-            cell_content = cell_value if cell_value != "" else "_____"
-            table_html += f'<td class="{cell_class}">{cell_content}</td>'
+            # Tạo HTML cho bảng song ngữ (cache dùng chung: khi trình chiếu chung bảng chỉ được dựng một lần cho mọi người xem)
+            with profiler.span('table'):
+                table_html = results_table_html(draw.result_table)
             
-            table_html += '</tr>'
+            # Hiển thị bảng
+            with profiler.span('table.send', bytes=len(table_html)):
+                st.markdown(table_html, unsafe_allow_html=True)
         
-        table_html += '</tbody></table>'
+        st.markdown('</div>', unsafe_allow_html=True)
         
-        # Hiển thị bảng
-        st.markdown(table_html, unsafe_allow_html=True)
+    if page_rendered and PROFILE_PATH:
+        profiler.record('fragment', profiler.elapsed_ms(), profiler.started)
+        get_profile_exporter(PROFILE_PATH).export(profiler, mode=WHEEL_RENDER_MODE, role=broadcast_role, tournament=tournament_id, scope='fragment')
+
+draw_area()
+
+# Số phiên còn mở trong các phiên đã thấy (None khi không chạy trong máy chủ Streamlit)
+def active_sessions():
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
     
-    st.markdown('</div>', unsafe_allow_html=True)
+    ctx = get_script_run_ctx()
+    if ctx is None or not Runtime.exists():
+        return None
+    runtime = Runtime.instance()
+    seen_sessions.add(ctx.session_id)
+    for session_id in list(seen_sessions):
+        if not runtime.is_active_session(session_id):
+            seen_sessions.discard(session_id)
+    return len(seen_sessions)
+
+# Thời gian của lần chạy này: thanh bên gỡ lỗi và tệp JSONL
+# Mỗi lần chạy trang cũng ghi một mẫu RSS theo số phiên để thấy bộ nhớ có tăng dần khi máy chủ chạy lâu
+profiler.record('run', profiler.elapsed_ms(), profiler.started)
+memory = memory_tracker.sample(sessions=active_sessions())
+if DEBUG_PANEL:
+    with st.sidebar:
+        st.subheader('Timing / Thời gian')
+        st.caption(f"run {profiler.run_id}: {profiler.elapsed_ms():.1f} ms")
+        st.dataframe(pd.DataFrame(profiler.summary()).round(2), hide_index=True, use_container_width=True)
+        st.caption(f"frame cache: {frame_cache.stats()}")
+        st.caption(f"html cache: {html_cache.stats()}")
+        st.caption("warm-up: " + ", ".join(f"{name} {ms:.0f} ms" for name, ms in warm_up_timings.items()))
+        if 'spin_stats' in st.session_state:
+            st.caption(f"last spin: {st.session_state.spin_stats}")
+        
+        st.subheader('Memory / Bộ nhớ')
+        per_session = f", {memory['rss_per_session_mb']:.1f} MB/session" if memory['sessions'] else ''
+        st.caption(f"RSS {memory['rss_mb']:.1f} MB, sessions: {memory['sessions'] or '?'}{per_session}")
+        st.caption(f"figure pool: {figure_pool.stats()}")
+        st.caption(f"prerendered spins: {prerender_budget.stats()}")
+        history = pd.DataFrame(memory_tracker.history())
+        history['time'] = pd.to_datetime(history['ts'], unit='s')
+        st.line_chart(history, x='time', y='rss_mb', height=160)
+        growth = memory_tracker.top_growth()
+        if growth:
+            st.dataframe(pd.DataFrame(growth).round(1), hide_index=True, use_container_width=True)
+if PROFILE_PATH:
+    get_profile_exporter(PROFILE_PATH).export(profiler, mode=WHEEL_RENDER_MODE, role=broadcast_role, tournament=tournament_id, scope='page',
+                                              rss_mb=round(memory['rss_mb'], 1), sessions=memory['sessions'])
+page_rendered = True
+
+# Khán giả: chờ trạng thái chung thay đổi rồi tải lại trang
+# Chờ từng giây và cập nhật placeholder để thao tác của người xem (đổi ngôn ngữ) không bị treo
+if broadcast_role == 'viewer':
+    heartbeat = st.empty()
+    deadline = time.time() + VIEWER_REFRESH_SECONDS
+    while time.time() < deadline and hub.wait_for_change(seen_version, timeout=1) == seen_version:
+        heartbeat.empty()
+    st.rerun()